@@ -1,27 +1,49 @@
 # backend/main.py
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-import os, json
+import os, sys
+
+# Shares the patch/journal and /data code with the watcher server
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "watcher"))
+from journal import JournaledDocument, PatchError, PatchConflict
+from data_view import data_response
 
 app = Flask(__name__)
 CORS(app)
 
 DATA_FILE = "data.json"
 
+# Held in memory; changes go to data.json.journal and are compacted into data.json
+data = JournaledDocument(DATA_FILE, [])
+
 @app.route("/data")
 def get_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE) as f:
-            return jsonify(json.load(f))
-    return jsonify([])
+    # ?offset=&limit= or ?cursor= for one page; ETag / If-None-Match for cheap polling
+    return data_response(data)
 
 @app.route("/save", methods=["POST"])
 def save_data():
-    with open(DATA_FILE, "w") as f:
-        json.dump(request.json, f, indent=2)
+    data.set(request.json)
     return jsonify({"status": "saved"})
 
+@app.route("/data", methods=["PATCH"])
+def patch_data():
+    # application/json-patch+json (RFC 6902) or application/merge-patch+json (RFC 7396)
+    body = request.get_json(force=True, silent=True)
+    if body is None:
+        return jsonify({"error": "No patch provided"}), 400
+    try:
+        if request.mimetype == "application/merge-patch+json" or not isinstance(body, list):
+            data.merge_patch(body)
+        else:
+            data.patch(body)
+    except PatchConflict as e:
+        return jsonify({"error": str(e)}), 409
+    except PatchError as e:
+        return jsonify({"error": str(e)}), 422
+    return jsonify({"status": "patched"})
+
 if __name__ == "__main__":
     port = int(os.getenv("FLASK_PORT", 5000))
     print(f"[Flask] Listening on http://127.0.0.1:{port}")
-    app.run(host="127.0.0.1", port=port, debug=False)
\ No newline at end of file
+    app.run(host="127.0.0.1", port=port, debug=False)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark - p50/p99 latency of the whole CodeForge.generate() call
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+from common import load_corpus, percentile, timed, tmpfs_dir
+from codeforge import CodeForge
+
+
+def run(rounds: int = 5) -> dict:
+    """Metrics for run_all.py: generate() latency, fresh and regenerated"""
+    forge = CodeForge(quiet=True)
+    ideas = load_corpus()
+    root = tempfile.mkdtemp(prefix='codeforge-bench-', dir=tmpfs_dir())
+    fresh, regen = [], []
+    try:
+        for r in range(rounds):
+            for i, idea in enumerate(ideas):
+                out = os.path.join(root, f"{r}-{i}")
+                fresh.append(timed(forge.generate, idea, out) * 1000)
+                regen.append(timed(forge.generate, idea, out) * 1000)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        'generate.fresh_p50_ms': round(percentile(fresh, 50), 3),
+        'generate.fresh_p99_ms': round(percentile(fresh, 99), 3),
+        'generate.regen_p50_ms': round(percentile(regen, 50), 3),
+        'generate.regen_p99_ms': round(percentile(regen, 99), 3),
+    }
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"📊 generate() latency ({rounds} rounds over the corpus)\n")
+    for name, value in run(rounds).items():
+        print(f"{name[len('generate.'):]:<16} {value:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Parse throughput benchmark - CodeForge.parse_idea on a synthetic corpus
+Compares the compiled matcher against the old per-feature substring scans
+"""
+
+import sys
+import time
+import random
+import string
+
+from common import best_of, load_corpus
+from codeforge import CodeForge
+from codeforge_matcher import KeywordMatcher
+
+VOCAB = [
+    'a', 'an', 'the', 'simple', 'tool', 'app', 'to', 'for', 'my', 'with', 'and', 'that',
+    'todo', 'list', 'recipe', 'manager', 'habit', 'tracker', 'daily', 'notes', 'markdown',
+    'url', 'shortener', 'analytics', 'chat', 'live', 'login', 'users', 'upload', 'photos',
+    'email', 'alerts', 'search', 'api', 'scrape', 'prices', 'every', 'morning', 'budget',
+    'expenses', 'categories', 'tags', 'folders', 'realtime', 'dashboard', 'websocket',
+    'schedule', 'cron', 'jobs', 'images', 'files', 'notify', 'team', 'edit', 'delete',
+]
+
+
+def make_corpus(size: int, seed: int = 42) -> list:
+    """Deterministic corpus of `size` ideas, 4-14 words each"""
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(VOCAB) for _ in range(rng.randint(4, 14))) for _ in range(size)]
+
+
+LEGACY_FEATURES = {
+    'has_auth': ['login', 'auth', 'user', 'signup', 'register'],
+    'has_crud': ['create', 'add', 'edit', 'delete', 'manage', 'list'],
+    'has_api': ['api', 'scrape', 'fetch', 'get', 'search'],
+    'has_upload': ['upload', 'file', 'image', 'photo'],
+    'has_email': ['email', 'notify', 'send', 'alert'],
+    'has_schedule': ['daily', 'schedule', 'cron', 'every'],
+    'is_realtime': ['chat', 'live', 'realtime', 'websocket'],
+}
+
+
+def big_lexicon(extra_per_feature: int, seed: int = 7) -> dict:
+    """The default lexicon padded with synthetic keywords, to show scaling"""
+    rng = random.Random(seed)
+    features = {name: list(words) for name, words in LEGACY_FEATURES.items()}
+    for words in features.values():
+        words += [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+                  for _ in range(extra_per_feature)]
+    return {'features': features, 'stopwords': ['that', 'with', 'from', 'into', 'your']}
+
+
+def legacy_parse(idea: str, lexicon: dict = None) -> dict:
+    """The pre-matcher parse_idea: one substring scan per feature"""
+    idea_lower = idea.lower()
+    lexicon_features = lexicon['features'] if lexicon else LEGACY_FEATURES
+    features = {name: any(word in idea_lower for word in words) for name, words in lexicon_features.items()}
+    words = idea_lower.split()
+    entities = [w for w in words if len(w) > 3 and w not in ['that', 'with', 'from', 'into', 'your']]
+    keywords = [w for w in idea.lower().split() if len(w) > 3 and w.isalnum()][:2]
+    app_name = ''.join(w.capitalize() for w in keywords) if keywords else 'MyApp'
+    return {'idea': idea, 'app_name': app_name, 'features': features, 'entities': entities[:3]}
+
+
+def bench(name: str, fn, corpus: list) -> float:
+    start = time.perf_counter()
+    for idea in corpus:
+        fn(idea)
+    elapsed = time.perf_counter() - start
+    rate = len(corpus) / elapsed
+    print(f"{name:<10} {elapsed:7.3f}s  {rate:>10,.0f} ideas/s  {elapsed / len(corpus) * 1e6:6.2f} µs/idea")
+    return rate
+
+
+def run(size: int = 100_000, repeats: int = 3) -> dict:
+    """Metrics for run_all.py: parse throughput on the synthetic and fixed corpora"""
+    forge = CodeForge(quiet=True)
+
+    def parse_all(ideas):
+        for idea in ideas:
+            forge.parse_idea(idea)
+
+    corpus = make_corpus(size)
+    synthetic = len(corpus) / best_of(repeats, parse_all, corpus)
+
+    fixed = load_corpus() * max(1, size // 50)
+    corpus_rate = len(fixed) / best_of(repeats, parse_all, fixed)
+
+    return {'parse.synthetic_ideas_per_s': round(synthetic), 'parse.corpus_ideas_per_s': round(corpus_rate)}
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    corpus = make_corpus(size)
+    forge = CodeForge()
+
+    mismatches = sum(1 for idea in corpus[:10_000] if forge.parse_idea(idea) != legacy_parse(idea))
+    print(f"📊 parse_idea on {size:,} ideas ({mismatches} mismatches vs legacy in first 10k)\n")
+
+    legacy = bench('legacy', legacy_parse, corpus)
+    compiled = bench('compiled', forge.parse_idea, corpus)
+    print(f"⚡ {compiled / legacy:.2f}x with the default lexicon\n")
+
+    # Legacy cost grows with keyword count, the compiled matcher's doesn't
+    lexicon = big_lexicon(50)
+    forge.matcher = KeywordMatcher(lexicon)
+    keywords = sum(len(words) for words in lexicon['features'].values())
+    legacy = bench('legacy', lambda idea: legacy_parse(idea, lexicon), corpus)
+    compiled = bench('compiled', forge.parse_idea, corpus)
+    print(f"⚡ {compiled / legacy:.2f}x with a {keywords}-keyword lexicon")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Render benchmark - time per template and per full in-memory project render
+"""
+
+import sys
+
+from common import best_of, load_corpus
+from codeforge import CodeForge
+
+
+def run(rounds: int = 200, repeats: int = 5) -> dict:
+    """Metrics for run_all.py: µs per template render and per full render"""
+    forge = CodeForge(quiet=True)
+    parsed = [forge.parse_idea(idea) for idea in load_corpus()]
+    contexts = [forge._context(p) for p in parsed]
+    metrics = {}
+
+    def render_all(name):
+        for _ in range(rounds):
+            for context in contexts:
+                forge.templates.render(name, context)
+
+    for name in forge.templates.names():
+        forge.templates.render(name, contexts[0])  # compile outside the timing
+        elapsed = best_of(repeats, render_all, name)
+        metrics[f"render.template.{name}_us"] = round(elapsed / (rounds * len(contexts)) * 1e6, 3)
+
+    def render_projects():
+        for _ in range(rounds):
+            for p in parsed:
+                forge._render(p)
+
+    elapsed = best_of(repeats, render_projects)
+    metrics['render.project_us'] = round(elapsed / (rounds * len(parsed)) * 1e6, 3)
+    return metrics
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"📊 Template render time ({rounds} rounds over the corpus)\n")
+    for name, value in run(rounds).items():
+        print(f"{name[len('render.'):]:<45} {value:8.3f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Write benchmark - files and bytes per second flushed to tmpfs and to real disk
+Measures fresh projects (staged + renamed) and no-op regenerations
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+from common import BENCH_DIR, load_corpus, tmpfs_dir
+from codeforge import CodeForge, DirectorySink
+
+
+def flush_pass(root: str, trees: list) -> float:
+    start = time.perf_counter()
+    for i, tree in enumerate(trees):
+        DirectorySink(os.path.join(root, str(i))).flush(tree)
+    return time.perf_counter() - start
+
+
+def bench_target(label: str, base: str, trees: list, repeats: int = 3) -> dict:
+    """Best of `repeats` fresh passes (each into an empty root) and no-op passes"""
+    files = sum(len(tree) for tree in trees)
+    size = sum(tree.total_bytes for tree in trees)
+
+    fresh = noop = float('inf')
+    for _ in range(repeats):
+        root = tempfile.mkdtemp(prefix='codeforge-bench-', dir=base)
+        try:
+            fresh = min(fresh, flush_pass(root, trees))
+            noop = min(noop, flush_pass(root, trees))
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        f"write.{label}.files_per_s": round(files / fresh),
+        f"write.{label}.mb_per_s": round(size / fresh / 1e6, 2),
+        f"write.{label}.noop_projects_per_s": round(len(trees) / noop),
+    }
+
+
+def run(copies: int = 4) -> dict:
+    """Metrics for run_all.py: flush throughput per filesystem"""
+    forge = CodeForge(quiet=True)
+    trees = [forge._render(forge.parse_idea(idea)) for idea in load_corpus()] * copies
+
+    targets = [('disk', BENCH_DIR)]
+    if tmpfs_dir():
+        targets.insert(0, ('tmpfs', tmpfs_dir()))
+
+    metrics = {}
+    for label, base in targets:
+        metrics.update(bench_target(label, base, trees))
+    return metrics
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    print("📊 Flush throughput\n")
+    for name, value in run(copies).items():
+        print(f"{name[len('write.'):]:<32} {value:>12,}")
+
+
+if __name__ == '__main__':
+    main()
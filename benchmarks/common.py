@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the CodeForge benchmarks
+"""
+
+import os
+import sys
+import math
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+
+CORPUS_FILE = os.path.join(BENCH_DIR, 'corpus.txt')
+
+
+def load_corpus() -> list:
+    """The fixed benchmark corpus (one idea per line, # comments)"""
+    with open(CORPUS_FILE) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def timed(fn, *args) -> float:
+    """Run fn once, return elapsed seconds"""
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def best_of(repeats: int, fn, *args) -> float:
+    """Fastest of several runs of fn, in seconds - filters scheduler noise"""
+    return min(timed(fn, *args) for _ in range(repeats))
+
+
+def tmpfs_dir():
+    """A RAM-backed directory if the OS has one, else None"""
+    return '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Run every CodeForge benchmark and compare against the stored baseline
+
+    python benchmarks/run_all.py          # compare with baseline.json
+    python benchmarks/run_all.py --save   # record a new baseline
+    python benchmarks/run_all.py --threshold 0.25   # noisier machines
+"""
+
+import os
+import sys
+import json
+import platform
+from datetime import datetime
+
+from common import BENCH_DIR
+import bench_parse
+import bench_render
+import bench_write
+import bench_generate
+
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Changes beyond this fraction in the bad direction are flagged
+REGRESSION_THRESHOLD = 0.15
+
+
+def higher_is_better(metric: str) -> bool:
+    return '_per_s' in metric
+
+
+def collect() -> dict:
+    metrics = {}
+    for bench in (bench_parse, bench_render, bench_write, bench_generate):
+        print(f"⏱️  {bench.__name__}...")
+        metrics.update(bench.run())
+    return metrics
+
+
+def compare(metrics: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> int:
+    """Print the delta per metric, return the number of regressions"""
+    regressions = 0
+    print(f"\n{'metric':<50} {'baseline':>12} {'now':>12} {'change':>9}")
+    for name, value in metrics.items():
+        old = baseline.get(name)
+        if not old:
+            print(f"{name:<50} {'-':>12} {value:>12} {'new':>9}")
+            continue
+        change = (value - old) / old
+        worse = -change if higher_is_better(name) else change
+        flag = ''
+        if worse > threshold:
+            flag = '  ❌ regression'
+            regressions += 1
+        elif worse < -threshold:
+            flag = '  ✅ faster'
+        print(f"{name:<50} {old:>12} {value:>12} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    args = sys.argv[1:]
+    threshold = REGRESSION_THRESHOLD
+    if '--threshold' in args:
+        threshold = float(args[args.index('--threshold') + 1])
+
+    metrics = collect()
+
+    if '--save' in args:
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump({
+                'recorded': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'metrics': metrics,
+            }, f, indent=2)
+        print(f"\n💾 Baseline saved to {BASELINE_FILE}")
+        return
+
+    if not os.path.exists(BASELINE_FILE):
+        print(json.dumps(metrics, indent=2))
+        print("\nNo baseline yet - run with --save to record one")
+        return
+
+    with open(BASELINE_FILE) as f:
+        baseline = json.load(f)
+    print(f"\n📊 Compared with baseline from {baseline['recorded']} (Python {baseline['python']})")
+    regressions = compare(metrics, baseline['metrics'], threshold)
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,11 +6,83 @@ Generates complete, working apps from one-line ideas
 
 import os
 import sys
-import json
 import re
+import json
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 
+from codeforge_blobs import BlobStore, BLOBS_DIR
+from codeforge_cache import GenerationCache, normalize_idea
+from codeforge_catalog import AppCatalog, CATALOG_NAME
+from codeforge_matcher import KeywordMatcher, DEFAULT_LEXICON
+from codeforge_output import FileTree, DirectorySink, ZipSink, TarSink
+from codeforge_templates import TemplateRegistry, DEFAULT_STACK
+
+# EVENT TYPES - every event is a dict with 'event' and 'ts' (epoch seconds)
+#   start        idea, app_name, features
+#   cache        hit
+#   stage_start  stage
+#   stage        stage, duration_ms, files, bytes (rendered, or written for 'write')
+#   file         path, bytes (each file actually written by the sink)
+#   done         app_name, location, files, files_changed, bytes_written, duration_ms
+#   error        idea, error, duration_ms
+# Stages: parse, structure, frontend, backend, database, deploy, readme, write
+
+
+def _ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+class ConsoleReporter:
+    """Prints generation events as the classic emoji progress lines"""
+    
+    STAGE_MESSAGES = {
+        'structure': "🏗️  Building structure...",
+        'frontend': "⚛️  Generating React frontend...",
+        'backend': "🚀 Generating Express backend...",
+        'database': "🗄️  Creating Supabase schema...",
+        'deploy': "📦 Creating deploy configs...",
+        'readme': "📖 Writing README...",
+        'write': "💾 Writing files...",
+    }
+    
+    def __call__(self, event: dict):
+        kind = event['event']
+        if kind == 'start':
+            print("🔥 CODEFORGE ACTIVATING...\n")
+            print(f"📦 Generating: {event['app_name']}")
+            print(f"💡 Idea: {event['idea']}")
+            print(f"🎯 Features detected: {', '.join(k.replace('has_', '').replace('is_', '') for k in event['features'])}\n")
+        elif kind == 'cache' and event['hit']:
+            print("⚡ Cache hit - reusing rendered project")
+        elif kind == 'stage_start' and event['stage'] in self.STAGE_MESSAGES:
+            print(self.STAGE_MESSAGES[event['stage']])
+        elif kind == 'stage' and event['stage'] == 'write':
+            print(f"📝 {event['files']} files changed ({event['bytes']} bytes written)")
+        elif kind == 'done':
+            if event['location'] is None:
+                print(f"\n✅ DONE! Packed {event['files']} files into an archive\n")
+            else:
+                print(f"\n✅ DONE! Generated in: {event['location']}\n")
+
+
+class JsonLinesReporter:
+    """Writes every generation event as one JSON line"""
+    
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+    
+    def __call__(self, event: dict):
+        line = json.dumps(event, ensure_ascii=False) + '\n'
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+
 class CodeForge:
     """Main CodeForge generator"""
     
@@ -22,40 +94,48 @@ class CodeForge:
         'deploy_backend': 'Render',
     }
     
+    # Compiled once at class load; override with CODEFORGE_LEXICON or CodeForge(lexicon=...)
+    MATCHER = KeywordMatcher.from_file(os.getenv('CODEFORGE_LEXICON') or DEFAULT_LEXICON)
+    
+    def __init__(self, lexicon: str = None, cache: GenerationCache = None, stack: str = DEFAULT_STACK,
+                 quiet: bool = False, listeners: list = None, catalog: AppCatalog = None,
+                 blobs: BlobStore = None):
+        self.lexicon = lexicon
+        self.matcher = KeywordMatcher.from_file(lexicon) if lexicon else self.MATCHER
+        self.cache = cache
+        self.stack = stack
+        self.templates = TemplateRegistry.for_stack(stack)
+        # quiet: library mode, no console output at all (not even the deploy banner)
+        self.quiet = quiet
+        # Caller's listeners, also handed to generate_many() workers
+        self.event_listeners = list(listeners or [])
+        self.listeners = list(self.event_listeners)
+        if not quiet:
+            self.listeners.insert(0, ConsoleReporter())
+        # catalog: every finished project under its directory gets indexed
+        self.catalog = catalog
+        if catalog:
+            self.listeners.append(catalog.listener())
+        # blobs: identical files across projects share storage (see codeforge_blobs.py)
+        self.blobs = blobs
+    
     def parse_idea(self, idea: str) -> dict:
         """Parse idea and extract features"""
-        idea_lower = idea.lower()
-        
-        features = {
-            'has_auth': any(word in idea_lower for word in ['login', 'auth', 'user', 'signup', 'register']),
-            'has_crud': any(word in idea_lower for word in ['create', 'add', 'edit', 'delete', 'manage', 'list']),
-            'has_api': any(word in idea_lower for word in ['api', 'scrape', 'fetch', 'get', 'search']),
-            'has_upload': any(word in idea_lower for word in ['upload', 'file', 'image', 'photo']),
-            'has_email': any(word in idea_lower for word in ['email', 'notify', 'send', 'alert']),
-            'has_schedule': any(word in idea_lower for word in ['daily', 'schedule', 'cron', 'every']),
-            'is_realtime': any(word in idea_lower for word in ['chat', 'live', 'realtime', 'websocket']),
-        }
-        
-        # Extract main entities (nouns)
-        words = idea_lower.split()
-        entities = [w for w in words if len(w) > 3 and w not in ['that', 'with', 'from', 'into', 'your']]
+        # One pass detects features, entities (nouns) and app name keywords
+        features, entities, name_keywords = self.matcher.scan(idea)
         
         # Generate app name
-        app_name = self._generate_app_name(idea)
+        app_name = self._generate_app_name(name_keywords)
         
         return {
             'idea': idea,
             'app_name': app_name,
             'features': features,
-            'entities': entities[:3],  # Top 3 entities
+            'entities': entities,  # Top 3 entities
         }
     
-    def _generate_app_name(self, idea: str) -> str:
-        """Generate app name from idea"""
-        # Extract key words
-        words = idea.lower().split()
-        keywords = [w for w in words if len(w) > 3 and w.isalnum()][:2]
-        
+    def _generate_app_name(self, keywords: list) -> str:
+        """Generate app name from the idea's leading keywords"""
         if keywords:
             name = ''.join(w.capitalize() for w in keywords)
         else:
@@ -63,58 +143,146 @@ class CodeForge:
         
         return name
     
-    def generate(self, idea: str, output_dir: str = None):
-        """Generate complete app from idea"""
-        print("🔥 CODEFORGE ACTIVATING...\n")
-        
-        # Parse idea
-        parsed = self.parse_idea(idea)
-        app_name = parsed['app_name']
-        features = parsed['features']
-        
-        print(f"📦 Generating: {app_name}")
-        print(f"💡 Idea: {idea}")
-        print(f"🎯 Features detected: {', '.join([k.replace('has_', '').replace('is_', '') for k, v in features.items() if v])}\n")
-        
-        # Set output directory
-        if not output_dir:
-            output_dir = f"generated/{app_name.lower()}"
-        
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-        
-        # Generate project structure
-        print("🏗️  Building structure...")
-        self._create_structure(output_path, parsed)
-        
-        # Generate frontend
-        print("⚛️  Generating React frontend...")
-        self._generate_frontend(output_path, parsed)
-        
-        # Generate backend
-        print("🚀 Generating Express backend...")
-        self._generate_backend(output_path, parsed)
-        
-        # Generate database
-        print("🗄️  Creating Supabase schema...")
-        self._generate_database(output_path, parsed)
-        
-        # Generate deployment files
-        print("📦 Creating deploy configs...")
-        self._generate_deploy_files(output_path, parsed)
-        
-        # Generate README
-        print("📖 Writing README...")
-        self._generate_readme(output_path, parsed)
-        
-        print(f"\n✅ DONE! Generated in: {output_path.absolute()}\n")
+    def add_listener(self, listener):
+        """Subscribe listener(event: dict) to generation events"""
+        self.event_listeners.append(listener)
+        self.listeners.append(listener)
+    
+    def _emit(self, event: str, **fields):
+        payload = {'event': event, 'ts': time.time(), **fields}
+        for listener in self.listeners:
+            listener(payload)
+    
+    def generate(self, idea: str, output_dir: str = None, sink=None):
+        """Generate complete app from idea.
+        
+        Files go to `output_dir` (default generated/<app>) unless a `sink`
+        such as ZipSink(stream) is given. Returns the output location, or
+        None for archive sinks. Progress is reported as events to listeners
+        (see EVENT TYPES above).
+        """
+        start = time.perf_counter()
+        try:
+            # Parse idea
+            parsed = self.parse_idea(idea)
+            app_name = parsed['app_name']
+            features = [k for k, v in parsed['features'].items() if v]
+            self._emit('start', idea=idea, app_name=app_name, features=features)
+            self._emit('stage', stage='parse', duration_ms=_ms(start), files=0, bytes=0)
+            
+            # Set output target
+            if sink is None:
+                sink = DirectorySink(output_dir or f"generated/{app_name.lower()}", blobs=self.blobs)
+            
+            # Render the whole project in memory (or reuse a cached render)
+            key = self._cache_key(parsed) if self.cache else None
+            out = self.cache.get(key) if key else None
+            if key:
+                self._emit('cache', hit=out is not None)
+            if out is None:
+                out = self._render(parsed)
+                if key:
+                    self.cache.put(key, out)
+            
+            # Flush it in one pass
+            self._emit('stage_start', stage='write')
+            stage_start = time.perf_counter()
+            report = sink.flush(out, on_file=self._on_file if self.listeners else None)
+            self._emit('stage', stage='write', duration_ms=_ms(stage_start),
+                       files=report['files_changed'], bytes=report['bytes_written'])
+        except Exception as e:
+            self._emit('error', idea=idea, error=f"{type(e).__name__}: {e}", duration_ms=_ms(start))
+            raise
+        
+        self._emit('done', app_name=app_name, location=sink.location, files=len(out),
+                   files_changed=report['files_changed'], bytes_written=report['bytes_written'],
+                   duration_ms=_ms(start))
         
         # Print deploy instructions
-        self._print_deploy_instructions(app_name, output_path)
+        if sink.location is not None and not self.quiet:
+            self._print_deploy_instructions(app_name, Path(sink.location))
         
-        return str(output_path.absolute())
+        return sink.location
     
-    def _create_structure(self, base_path: Path, parsed: dict):
+    def _on_file(self, path: str, size: int):
+        self._emit('file', path=path, bytes=size)
+    
+    def _cache_key(self, parsed: dict) -> str:
+        """Cache key from the parse of the normalized idea"""
+        normalized = self.parse_idea(normalize_idea(parsed['idea']))
+        # Rendered files carry the app name derived from the raw idea
+        normalized['app_name'] = parsed['app_name']
+        return self.cache.key(normalized, self.templates.version)
+    
+    def _render(self, parsed: dict) -> FileTree:
+        """Render every project file into an in-memory tree, one timed stage per step"""
+        out = FileTree(parsed['app_name'].lower())
+        
+        for stage, step in (
+            ('structure', self._create_structure),
+            ('frontend', self._generate_frontend),
+            ('backend', self._generate_backend),
+            ('database', self._generate_database),
+            ('deploy', self._generate_deploy_files),
+            ('readme', self._generate_readme),
+        ):
+            self._emit('stage_start', stage=stage)
+            files, size = len(out), out.total_bytes
+            start = time.perf_counter()
+            step(out, parsed)
+            self._emit('stage', stage=stage, duration_ms=_ms(start),
+                       files=len(out) - files, bytes=out.total_bytes - size)
+        
+        return out
+    
+    def generate_many(self, ideas, workers: int = None, on_result=None) -> list:
+        """Generate many ideas across a process pool.
+        
+        Returns one result dict per idea, in input order. Failures are
+        reported in the result's 'error' field instead of aborting the batch.
+        `on_result` is called with each result as soon as it completes.
+        Workers use this instance's lexicon, stack, cache, catalog and blob
+        store. The listeners passed to the constructor get every event; from
+        worker processes they arrive together as each idea completes. Batches
+        never print: report progress from `on_result`.
+        """
+        ideas = list(ideas)
+        results = [None] * len(ideas)
+        options = {
+            'cache_dir': str(self.cache.directory) if self.cache else None,
+            'catalog_path': str(self.catalog.path) if self.catalog else None,
+            'blobs_dir': str(self.blobs.root) if self.blobs else None,
+            'lexicon': self.lexicon,
+            'stack': self.stack,
+        }
+        
+        if workers is not None and workers <= 1:
+            for i, idea in enumerate(ideas):
+                results[i] = generate_one(idea, listeners=self.event_listeners, **options)
+                if on_result:
+                    on_result(results[i])
+            return results
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_generate_collecting, idea, bool(self.event_listeners), options): i
+                       for i, idea in enumerate(ideas)}
+            for future in as_completed(futures):
+                i = futures[future]
+                events = []
+                try:
+                    results[i], events = future.result()
+                except Exception as e:
+                    # Worker process died (e.g. BrokenProcessPool)
+                    results[i] = _result(ideas[i], error=f"{type(e).__name__}: {e}")
+                for event in events:
+                    for listener in self.event_listeners:
+                        listener(event)
+                if on_result:
+                    on_result(results[i])
+        
+        return results
+    
+    def _create_structure(self, out: FileTree, parsed: dict):
         """Create project directory structure"""
         dirs = [
             'frontend/src/components',
@@ -129,744 +297,56 @@ class CodeForge:
         ]
         
         for dir_path in dirs:
-            (base_path / dir_path).mkdir(parents=True, exist_ok=True)
+            out.mkdir(dir_path)
     
-    def _generate_frontend(self, base_path: Path, parsed: dict):
-        """Generate React frontend"""
-        app_name = parsed['app_name']
-        features = parsed['features']
-        
-        # package.json
-        package_json = {
-            "name": f"{app_name.lower()}-frontend",
-            "version": "0.1.0",
-            "type": "module",
-            "scripts": {
-                "dev": "vite",
-                "build": "vite build",
-                "preview": "vite preview"
-            },
-            "dependencies": {
-                "react": "^18.3.1",
-                "react-dom": "^18.3.1",
-                "axios": "^1.7.2"
-            },
-            "devDependencies": {
-                "@vitejs/plugin-react": "^4.3.0",
-                "vite": "^5.4.0"
-            }
+    def _context(self, parsed: dict) -> dict:
+        """Values substituted into templates"""
+        return {
+            'app_name': parsed['app_name'],
+            'app_slug': parsed['app_name'].lower(),
+            'idea': parsed['idea'],
         }
-        
-        with open(base_path / 'frontend/package.json', 'w') as f:
-            json.dump(package_json, f, indent=2)
-        
-        # vite.config.js
-        vite_config = """import { defineConfig } from 'vite'
-import react from '@vitejs/plugin-react'
-
-export default defineConfig({
-  plugins: [react()],
-  server: {
-    proxy: {
-      '/api': {
-        target: 'http://localhost:5001',
-        changeOrigin: true,
-      }
-    }
-  }
-})
-"""
-        with open(base_path / 'frontend/vite.config.js', 'w') as f:
-            f.write(vite_config)
-        
-        # index.html
-        index_html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>{app_name}</title>
-</head>
-<body>
-  <div id="root"></div>
-  <script type="module" src="/src/main.jsx"></script>
-</body>
-</html>
-"""
-        with open(base_path / 'frontend/index.html', 'w') as f:
-            f.write(index_html)
-        
-        # src/main.jsx
-        main_jsx = """import React from 'react'
-import ReactDOM from 'react-dom/client'
-import App from './App'
-import './index.css'
-
-ReactDOM.createRoot(document.getElementById('root')).render(
-  <React.StrictMode>
-    <App />
-  </React.StrictMode>
-)
-"""
-        with open(base_path / 'frontend/src/main.jsx', 'w') as f:
-            f.write(main_jsx)
-        
-        # src/App.jsx
-        app_jsx = self._get_react_app(parsed)
-        with open(base_path / 'frontend/src/App.jsx', 'w') as f:
-            f.write(app_jsx)
-        
-        # src/index.css
-        css = """* {
-  margin: 0;
-  padding: 0;
-  box-sizing: border-box;
-}
-
-body {
-  font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, sans-serif;
-  background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-  min-height: 100vh;
-  color: #333;
-}
-
-.app {
-  max-width: 1200px;
-  margin: 0 auto;
-  padding: 2rem;
-}
-
-.card {
-  background: white;
-  border-radius: 12px;
-  padding: 2rem;
-  box-shadow: 0 10px 40px rgba(0,0,0,0.1);
-  margin-bottom: 2rem;
-}
-
-h1 {
-  color: #667eea;
-  margin-bottom: 1rem;
-}
-
-button {
-  background: #667eea;
-  color: white;
-  border: none;
-  padding: 0.75rem 1.5rem;
-  border-radius: 8px;
-  cursor: pointer;
-  font-size: 1rem;
-  font-weight: 600;
-  transition: all 0.3s;
-}
-
-button:hover {
-  background: #764ba2;
-  transform: translateY(-2px);
-  box-shadow: 0 5px 15px rgba(0,0,0,0.2);
-}
-
-button:disabled {
-  background: #ccc;
-  cursor: not-allowed;
-  transform: none;
-}
-
-input, textarea {
-  width: 100%;
-  padding: 0.75rem;
-  border: 2px solid #e0e0e0;
-  border-radius: 8px;
-  font-size: 1rem;
-  margin-bottom: 1rem;
-  transition: border 0.3s;
-}
-
-input:focus, textarea:focus {
-  outline: none;
-  border-color: #667eea;
-}
-
-.status {
-  padding: 1rem;
-  border-radius: 8px;
-  margin-bottom: 1rem;
-}
-
-.status.success {
-  background: #d4edda;
-  color: #155724;
-}
-
-.status.error {
-  background: #f8d7da;
-  color: #721c24;
-}
-
-.loading {
-  display: inline-block;
-  width: 20px;
-  height: 20px;
-  border: 3px solid #f3f3f3;
-  border-top: 3px solid #667eea;
-  border-radius: 50%;
-  animation: spin 1s linear infinite;
-}
-
-@keyframes spin {
-  0% { transform: rotate(0deg); }
-  100% { transform: rotate(360deg); }
-}
-"""
-        with open(base_path / 'frontend/src/index.css', 'w') as f:
-            f.write(css)
-    
-    def _get_react_app(self, parsed: dict) -> str:
-        """Generate App.jsx based on features"""
-        app_name = parsed['app_name']
-        features = parsed['features']
-        idea = parsed['idea']
-        
-        return f"""import {{ useState, useEffect }} from 'react'
-import axios from 'axios'
-
-const API_URL = import.meta.env.VITE_API_URL || '/api'
-
-function App() {{
-  const [data, setData] = useState([])
-  const [input, setInput] = useState('')
-  const [loading, setLoading] = useState(false)
-  const [status, setStatus] = useState(null)
-
-  useEffect(() => {{
-    fetchData()
-  }}, [])
-
-  const fetchData = async () => {{
-    try {{
-      const response = await axios.get(`${{API_URL}}/items`)
-      setData(response.data)
-    }} catch (error) {{
-      console.error('Error fetching data:', error)
-    }}
-  }}
-
-  const handleSubmit = async (e) => {{
-    e.preventDefault()
-    if (!input.trim()) return
-
-    setLoading(true)
-    setStatus(null)
-
-    try {{
-      const response = await axios.post(`${{API_URL}}/items`, {{
-        content: input
-      }})
-      
-      setData([response.data, ...data])
-      setInput('')
-      setStatus({{ type: 'success', message: 'Added successfully!' }})
-    }} catch (error) {{
-      setStatus({{ type: 'error', message: error.response?.data?.error || 'Failed to add' }})
-    }} finally {{
-      setLoading(false)
-    }}
-  }}
-
-  const handleDelete = async (id) => {{
-    try {{
-      await axios.delete(`${{API_URL}}/items/${{id}}`)
-      setData(data.filter(item => item.id !== id))
-      setStatus({{ type: 'success', message: 'Deleted successfully!' }})
-    }} catch (error) {{
-      setStatus({{ type: 'error', message: 'Failed to delete' }})
-    }}
-  }}
-
-  return (
-    <div className="app">
-      <div className="card">
-        <h1>{app_name}</h1>
-        <p style={{{{ color: '#666', marginBottom: '2rem' }}}}>
-          {idea}
-        </p>
-
-        {{status && (
-          <div className={{`status ${{status.type}}`}}>
-            {{status.message}}
-          </div>
-        )}}
-
-        <form onSubmit={{handleSubmit}}>
-          <input
-            type="text"
-            value={{input}}
-            onChange={{(e) => setInput(e.target.value)}}
-            placeholder="Enter something..."
-            disabled={{loading}}
-          />
-          <button type="submit" disabled={{loading}}>
-            {{loading ? <span className="loading"></span> : 'Submit'}}
-          </button>
-        </form>
-      </div>
-
-      <div className="card">
-        <h2>Items ({{data.length}})</h2>
-        {{data.length === 0 ? (
-          <p style={{{{ color: '#666', textAlign: 'center', padding: '2rem' }}}}>
-            No items yet. Add one above!
-          </p>
-        ) : (
-          <div style={{{{ display: 'flex', flexDirection: 'column', gap: '1rem' }}}}>
-            {{data.map(item => (
-              <div
-                key={{item.id}}
-                style={{{{
-                  display: 'flex',
-                  justifyContent: 'space-between',
-                  alignItems: 'center',
-                  padding: '1rem',
-                  background: '#f8f9fa',
-                  borderRadius: '8px'
-                }}}}
-              >
-                <span>{{item.content}}</span>
-                <button
-                  onClick={{() => handleDelete(item.id)}}
-                  style={{{{ background: '#dc3545' }}}}
-                >
-                  Delete
-                </button>
-              </div>
-            ))}}
-          </div>
-        )}}
-      </div>
-    </div>
-  )
-}}
-
-export default App
-"""
     
-    def _generate_backend(self, base_path: Path, parsed: dict):
+    def _render_templates(self, out: FileTree, parsed: dict, names: list):
+        """Render templates into the tree at their output paths"""
+        context = self._context(parsed)
+        for name in names:
+            out.write(name, self.templates.render(name, context))
+    
+    def _generate_frontend(self, out: FileTree, parsed: dict):
+        """Generate React frontend"""
+        self._render_templates(out, parsed, [
+            'frontend/package.json',
+            'frontend/vite.config.js',
+            'frontend/index.html',
+            'frontend/src/main.jsx',
+            'frontend/src/App.jsx',
+            'frontend/src/index.css',
+        ])
+    
+    def _generate_backend(self, out: FileTree, parsed: dict):
         """Generate Express backend"""
-        app_name = parsed['app_name']
-        
-        # package.json
-        package_json = {
-            "name": f"{app_name.lower()}-backend",
-            "version": "0.1.0",
-            "type": "module",
-            "scripts": {
-                "start": "node server.js",
-                "dev": "node --watch server.js"
-            },
-            "dependencies": {
-                "express": "^4.19.2",
-                "cors": "^2.8.5",
-                "@supabase/supabase-js": "^2.43.0",
-                "dotenv": "^16.4.5"
-            }
-        }
-        
-        with open(base_path / 'backend/package.json', 'w') as f:
-            json.dump(package_json, f, indent=2)
-        
-        # server.js
-        server_js = f"""import express from 'express'
-import cors from 'cors'
-import {{ createClient }} from '@supabase/supabase-js'
-import dotenv from 'dotenv'
-
-dotenv.config()
-
-const app = express()
-const PORT = process.env.PORT || 5001
-
-// Supabase client
-const supabase = createClient(
-  process.env.SUPABASE_URL || 'https://your-project.supabase.co',
-  process.env.SUPABASE_ANON_KEY || 'your-anon-key'
-)
-
-// Middleware
-app.use(cors())
-app.use(express.json())
-
-// Routes
-app.get('/api/health', (req, res) => {{
-  res.json({{ status: 'healthy', timestamp: new Date().toISOString() }})
-}})
-
-app.get('/api/items', async (req, res) => {{
-  try {{
-    const {{ data, error }} = await supabase
-      .from('items')
-      .select('*')
-      .order('created_at', {{ ascending: false }})
-    
-    if (error) throw error
-    res.json(data || [])
-  }} catch (error) {{
-    console.error('Error fetching items:', error)
-    res.status(500).json({{ error: error.message }})
-  }}
-}})
-
-app.post('/api/items', async (req, res) => {{
-  try {{
-    const {{ content }} = req.body
-    
-    if (!content) {{
-      return res.status(400).json({{ error: 'Content is required' }})
-    }}
-    
-    const {{ data, error }} = await supabase
-      .from('items')
-      .insert([{{ content }}])
-      .select()
-      .single()
-    
-    if (error) throw error
-    res.status(201).json(data)
-  }} catch (error) {{
-    console.error('Error creating item:', error)
-    res.status(500).json({{ error: error.message }})
-  }}
-}})
-
-app.delete('/api/items/:id', async (req, res) => {{
-  try {{
-    const {{ id }} = req.params
-    
-    const {{ error }} = await supabase
-      .from('items')
-      .delete()
-      .eq('id', id)
-    
-    if (error) throw error
-    res.json({{ message: 'Deleted successfully' }})
-  }} catch (error) {{
-    console.error('Error deleting item:', error)
-    res.status(500).json({{ error: error.message }})
-  }}
-}})
-
-app.listen(PORT, () => {{
-  console.log(`🚀 {app_name} API running on http://localhost:${{PORT}}`)
-  console.log(`📊 Health check: http://localhost:${{PORT}}/api/health`)
-}})
-"""
-        with open(base_path / 'backend/server.js', 'w') as f:
-            f.write(server_js)
-        
-        # .env.example
-        env_example = """# Supabase Configuration
-SUPABASE_URL=https://your-project.supabase.co
-SUPABASE_ANON_KEY=your-anon-key-here
-
-# Server
-PORT=5001
-"""
-        with open(base_path / 'backend/.env.example', 'w') as f:
-            f.write(env_example)
+        self._render_templates(out, parsed, [
+            'backend/package.json',
+            'backend/server.js',
+            'backend/.env.example',
+        ])
     
-    def _generate_database(self, base_path: Path, parsed: dict):
+    def _generate_database(self, out: FileTree, parsed: dict):
         """Generate Supabase schema"""
-        
-        schema_sql = """-- Enable UUID extension
-create extension if not exists "uuid-ossp";
-
--- Items table
-create table if not exists items (
-  id uuid primary key default uuid_generate_v4(),
-  content text not null,
-  created_at timestamp with time zone default now(),
-  updated_at timestamp with time zone default now()
-);
-
--- Enable Row Level Security
-alter table items enable row level security;
-
--- Policy: Anyone can read items
-create policy "Items are viewable by everyone"
-  on items for select
-  using (true);
-
--- Policy: Anyone can insert items (adjust for auth later)
-create policy "Items are insertable by everyone"
-  on items for insert
-  with check (true);
-
--- Policy: Anyone can delete their items (adjust for auth later)
-create policy "Items are deletable by everyone"
-  on items for delete
-  using (true);
-
--- Indexes
-create index if not exists items_created_at_idx on items(created_at desc);
-"""
-        with open(base_path / 'supabase/schema.sql', 'w') as f:
-            f.write(schema_sql)
+        self._render_templates(out, parsed, ['supabase/schema.sql'])
     
-    def _generate_deploy_files(self, base_path: Path, parsed: dict):
+    def _generate_deploy_files(self, out: FileTree, parsed: dict):
         """Generate deployment configuration files"""
-        app_name = parsed['app_name']
-        
-        # netlify.toml
-        netlify_toml = """[build]
-  command = "cd frontend && npm install && npm run build"
-  publish = "frontend/dist"
-
-[[redirects]]
-  from = "/api/*"
-  to = "https://YOUR_APP_NAME.onrender.com/api/:splat"
-  status = 200
-
-[[redirects]]
-  from = "/*"
-  to = "/index.html"
-  status = 200
-"""
-        with open(base_path / 'netlify.toml', 'w') as f:
-            f.write(netlify_toml)
-        
-        # render.yaml
-        render_yaml = f"""services:
-  - type: web
-    name: {app_name.lower()}-api
-    env: node
-    buildCommand: cd backend && npm install
-    startCommand: cd backend && npm start
-    envVars:
-      - key: SUPABASE_URL
-        sync: false
-      - key: SUPABASE_ANON_KEY
-        sync: false
-"""
-        with open(base_path / 'render.yaml', 'w') as f:
-            f.write(render_yaml)
-        
-        # .gitignore
-        gitignore = """node_modules/
-dist/
-.env
-.DS_Store
-*.log
-"""
-        with open(base_path / '.gitignore', 'w') as f:
-            f.write(gitignore)
+        self._render_templates(out, parsed, [
+            'netlify.toml',
+            'render.yaml',
+            '.gitignore',
+        ])
     
-    def _generate_readme(self, base_path: Path, parsed: dict):
+    def _generate_readme(self, out: FileTree, parsed: dict):
         """Generate comprehensive README"""
-        app_name = parsed['app_name']
-        idea = parsed['idea']
-        
-        readme = f"""# {app_name}
-
-> {idea}
-
-[![Deploy to Netlify](https://www.netlify.com/img/deploy/button.svg)](https://app.netlify.com/start/deploy)
-[![Deploy to Render](https://render.com/images/deploy-to-render-button.svg)](https://render.com/deploy)
-
-## 🚀 What It Does
-
-{idea}
-
-## ⚡ Tech Stack
-
-- **Frontend**: Vite + React → Netlify
-- **Backend**: Node.js + Express → Render  
-- **Database**: Supabase (PostgreSQL)
-- **Deploy**: 1-click with buttons above
-
-## 🎯 Features
-
-✅ Full CRUD operations  
-✅ Real-time updates  
-✅ Modern React UI  
-✅ RESTful API  
-✅ PostgreSQL database  
-✅ 1-click deployment  
-
-## 📦 Project Structure
-
-```
-{app_name.lower()}/
-├── frontend/              # React + Vite
-│   ├── src/
-│   │   ├── App.jsx       # Main component
-│   │   ├── main.jsx      # Entry point
-│   │   └── index.css     # Styles
-│   ├── package.json
-│   └── vite.config.js
-├── backend/               # Express API
-│   ├── server.js         # API server
-│   ├── package.json
-│   └── .env.example
-├── supabase/
-│   └── schema.sql        # Database schema
-├── netlify.toml          # Frontend deploy config
-└── render.yaml           # Backend deploy config
-```
-
-## 🏃 Run Locally (5 minutes)
-
-### 1️⃣ Clone & Install
-
-```bash
-git clone <your-repo-url>
-cd {app_name.lower()}
-
-# Install frontend
-cd frontend && npm install
-
-# Install backend
-cd ../backend && npm install
-```
-
-### 2️⃣ Setup Supabase
-
-1. Go to [supabase.com](https://supabase.com)
-2. Create a new project (free tier)
-3. Go to SQL Editor → paste contents of `supabase/schema.sql` → Run
-4. Copy your project URL and anon key from Settings → API
-
-### 3️⃣ Configure Environment
-
-```bash
-cd backend
-cp .env.example .env
-# Edit .env with your Supabase credentials
-```
-
-### 4️⃣ Start Everything
-
-```bash
-# Terminal 1 - Backend
-cd backend && npm run dev
-
-# Terminal 2 - Frontend  
-cd frontend && npm run dev
-```
-
-Open [http://localhost:5173](http://localhost:5173) 🎉
-
-## ☁️ Deploy to Production (1-click)
-
-### Option A: Netlify + Render (Recommended)
-
-#### Frontend (Netlify)
-1. Click "Deploy to Netlify" button above
-2. Connect your GitHub repo
-3. Click "Deploy" → Done! ✅
-
-#### Backend (Render)
-1. Click "Deploy to Render" button above
-2. Connect your GitHub repo
-3. Add environment variables:
-   - `SUPABASE_URL`
-   - `SUPABASE_ANON_KEY`
-4. Click "Deploy" → Done! ✅
-
-#### Update Frontend API URL
-1. In Netlify, go to Site settings → Environment variables
-2. Add: `VITE_API_URL` = `https://your-app.onrender.com`
-3. Redeploy
-
-### Option B: Manual Deploy
-
-#### Netlify (Frontend)
-```bash
-cd frontend
-npm run build
-npx netlify-cli deploy --prod
-```
-
-#### Render (Backend)
-1. Connect GitHub repo
-2. Select `backend` as root directory
-3. Build command: `npm install`
-4. Start command: `npm start`
-
-## 🔧 Environment Variables
-
-### Backend (.env)
-```
-SUPABASE_URL=https://xxxxx.supabase.co
-SUPABASE_ANON_KEY=your-anon-key
-PORT=5001
-```
-
-### Frontend (Netlify)
-```
-VITE_API_URL=https://your-app.onrender.com
-```
-
-## 📡 API Endpoints
-
-```
-GET    /api/health        # Health check
-GET    /api/items         # Get all items
-POST   /api/items         # Create item
-DELETE /api/items/:id     # Delete item
-```
-
-## 🎨 Customization
-
-### Change Colors
-Edit `frontend/src/index.css`:
-```css
---primary: #667eea;    /* Change this */
---secondary: #764ba2;  /* And this */
-```
-
-### Add Authentication
-1. Enable Supabase Auth in dashboard
-2. Add auth routes in `backend/server.js`
-3. Use `supabase.auth.signIn()` in frontend
-
-### Add More Features
-- File uploads → Add Supabase Storage
-- Real-time → Use Supabase Realtime
-- Email → Add SendGrid/Resend
-
-## 🐛 Troubleshooting
-
-**CORS errors?**
-- Make sure backend URL is set in Netlify env vars
-- Check `netlify.toml` redirect rules
-
-**Database errors?**
-- Verify Supabase credentials in `.env`
-- Check Row Level Security policies in Supabase
-
-**Build fails?**
-- Delete `node_modules` and reinstall
-- Check Node version (needs 18+)
-
-## 📝 License
-
-MIT - Do whatever you want!
-
-## 🚀 What's Next?
-
-- [ ] Add user authentication
-- [ ] Add file uploads
-- [ ] Add email notifications
-- [ ] Add admin dashboard
-- [ ] Add analytics
-
----
-
-**Made with CodeForge** 🔥  
-Built in < 5 minutes • Deployed in 1 click
-"""
-        with open(base_path / 'README.md', 'w') as f:
-            f.write(readme)
+        self._render_templates(out, parsed, ['README.md'])
     
     def _print_deploy_instructions(self, app_name: str, output_path: Path):
         """Print deployment instructions"""
@@ -927,10 +407,136 @@ Built in < 5 minutes • Deployed in 1 click
         print("=" * 70)
 
 
+def _result(idea: str, app_name: str = None, path: str = None, error: str = None, seconds: float = 0.0,
+            files_changed: int = None, bytes_written: int = None) -> dict:
+    """Build a per-idea batch result"""
+    return {
+        'idea': idea,
+        'app_name': app_name,
+        'path': path,
+        'error': error,
+        'seconds': round(seconds, 4),
+        'files_changed': files_changed,
+        'bytes_written': bytes_written,
+    }
+
+
+_worker_caches = {}
+
+
+def _worker_cache(cache_dir: str):
+    """One GenerationCache per directory per process"""
+    if not cache_dir:
+        return None
+    if cache_dir not in _worker_caches:
+        _worker_caches[cache_dir] = GenerationCache(cache_dir)
+    return _worker_caches[cache_dir]
+
+
+_worker_catalogs = {}
+
+
+def _worker_catalog(catalog_path: str):
+    """One AppCatalog per database per process"""
+    if not catalog_path:
+        return None
+    if catalog_path not in _worker_catalogs:
+        _worker_catalogs[catalog_path] = AppCatalog(catalog_path)
+    return _worker_catalogs[catalog_path]
+
+
+def generate_one(idea: str, output_dir: str = None, cache_dir: str = None, listeners: list = None,
+                 catalog_path: str = None, blobs_dir: str = None, lexicon: str = None,
+                 stack: str = DEFAULT_STACK) -> dict:
+    """Generate a single idea without console output.
+    
+    Module-level so it can be shipped to ProcessPoolExecutor workers.
+    `listeners` also receive every generation event (in-process use only).
+    """
+    start = time.perf_counter()
+    app_name = None
+    done = {}
+    try:
+        forge = CodeForge(lexicon=lexicon, stack=stack, cache=_worker_cache(cache_dir), quiet=True,
+                          listeners=[lambda e: done.update(e) if e['event'] == 'done' else None,
+                                     *(listeners or [])],
+                          catalog=_worker_catalog(catalog_path),
+                          blobs=BlobStore(blobs_dir) if blobs_dir else None)
+        app_name = forge.parse_idea(idea)['app_name']
+        path = forge.generate(idea, output_dir)
+        return _result(idea, app_name, path, seconds=time.perf_counter() - start,
+                       files_changed=done.get('files_changed'), bytes_written=done.get('bytes_written'))
+    except Exception as e:
+        return _result(idea, app_name, error=f"{type(e).__name__}: {e}",
+                       seconds=time.perf_counter() - start)
+
+
+def _generate_collecting(idea: str, collect: bool, options: dict) -> tuple:
+    """generate_one() in a worker: (result, the idea's events if `collect`)"""
+    events = []
+    result = generate_one(idea, listeners=[events.append] if collect else None, **options)
+    return result, events
+
+
+def _cli_forge(jsonl: bool = False) -> CodeForge:
+    """CodeForge for the CLI; CODEFORGE_CACHE_DIR turns on the render cache,
+    CODEFORGE_DEDUP=1 the shared blob store"""
+    cache_dir = os.getenv('CODEFORGE_CACHE_DIR')
+    return CodeForge(cache=GenerationCache(cache_dir) if cache_dir else None,
+                     quiet=jsonl, listeners=[JsonLinesReporter()] if jsonl else None,
+                     catalog=AppCatalog(os.getenv('CODEFORGE_CATALOG') or f"generated/{CATALOG_NAME}"),
+                     blobs=BlobStore(f"generated/{BLOBS_DIR}") if os.getenv('CODEFORGE_DEDUP') == '1' else None)
+
+
+def run_gc(min_age: float = 3600) -> int:
+    """Prune blobs no generated project links to any more"""
+    result = BlobStore(f"generated/{BLOBS_DIR}").gc(min_age)
+    print(f"🧹 Removed {result['removed']} unreferenced blobs ({result['bytes_freed']} bytes), "
+          f"kept {result['kept']}")
+    return 0
+
+
+def run_batch(ideas_file: str, workers: int = None, jsonl: bool = False) -> int:
+    """Generate every idea in a file (one per line), return exit code"""
+    with open(ideas_file) as f:
+        ideas = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+    
+    if not ideas:
+        print(f"❌ No ideas found in {ideas_file}")
+        return 1
+    
+    if not jsonl:
+        print(f"🔥 CODEFORGE BATCH: {len(ideas)} ideas, {workers or os.cpu_count()} workers\n")
+    
+    def report(result):
+        if jsonl:
+            print(json.dumps({'event': 'result', **result}, ensure_ascii=False), flush=True)
+        elif result['error']:
+            print(f"❌ {result['idea']}: {result['error']}")
+        else:
+            print(f"✅ {result['app_name']} ({result['seconds']:.2f}s) → {result['path']}")
+    
+    start = time.perf_counter()
+    results = _cli_forge().generate_many(ideas, workers=workers, on_result=report)
+    elapsed = time.perf_counter() - start
+    
+    failed = sum(1 for r in results if r['error'])
+    rate = len(results) / elapsed * 60 if elapsed else 0
+    if jsonl:
+        print(json.dumps({'event': 'batch_done', 'generated': len(results) - failed, 'failed': failed,
+                          'seconds': round(elapsed, 3)}))
+        return 1 if failed else 0
+    print(f"\n📊 {len(results) - failed} generated, {failed} failed in {elapsed:.1f}s ({rate:.0f} apps/min)")
+    return 1 if failed else 0
+
+
 def main():
     """Main entry point"""
     if len(sys.argv) < 2:
         print("Usage: python codeforge.py \"Your app idea here\"")
+        print("       python codeforge.py --batch ideas.txt [--workers N]")
+        print("       python codeforge.py gc   # prune unreferenced blobs (CODEFORGE_DEDUP)")
+        print("       add --jsonl for JSON-lines events instead of console output")
         print()
         print("Examples:")
         print('  python codeforge.py "A tool to track my daily habits"')
@@ -938,9 +544,33 @@ def main():
         print('  python codeforge.py "Recipe manager with search"')
         sys.exit(1)
     
-    idea = ' '.join(sys.argv[1:])
+    args = sys.argv[1:]
+    jsonl = '--jsonl' in args
+    if jsonl:
+        args.remove('--jsonl')
+    
+    if args == ['gc']:
+        sys.exit(run_gc())
+    
+    if args and args[0] == '--batch':
+        args = args[1:]
+        workers = None
+        if '--workers' in args:
+            i = args.index('--workers')
+            value = args[i + 1] if i + 1 < len(args) else ''
+            if not value.isdigit() or int(value) < 1:
+                print("Usage: python codeforge.py --batch ideas.txt [--workers N]")
+                sys.exit(1)
+            workers = int(value)
+            del args[i:i + 2]
+        if len(args) != 1:
+            print("Usage: python codeforge.py --batch ideas.txt [--workers N]")
+            sys.exit(1)
+        sys.exit(run_batch(args[0], workers, jsonl))
+    
+    idea = ' '.join(args)
     
-    forge = CodeForge()
+    forge = _cli_forge(jsonl)
     forge.generate(idea)
 
 
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+CodeForge blob store - content-addressed file storage shared by projects
+Each unique file is stored once and reflinked or hardlinked into projects
+"""
+
+import os
+import sys
+import time
+import uuid
+import errno
+import hashlib
+from pathlib import Path
+
+BLOBS_DIR = '.blobs'
+# Blobs found modified in place are moved here (inside the store, so gc() still sweeps them)
+QUARANTINE_DIR = 'quarantine'
+
+# Linux ioctl that clones a file's extents (btrfs, XFS, bcachefs, ...)
+FICLONE = 0x40049409
+
+# Errors meaning "this filesystem can't share the file" - fall back to a copy
+_NO_SHARE = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EINVAL,
+             errno.ENOTTY, errno.ENOSYS}
+
+
+class BlobStore:
+    """Files keyed by SHA-256 under `root`/<first 2 hex>/<digest>.
+
+    materialize() puts a file into a project as a reflink of its blob when
+    the filesystem supports it (an independent copy sharing extents), else
+    as a hardlink, else as a plain copy (e.g. across filesystems). Hardlinked
+    files are the same inode in every project, so blobs are read-only: an
+    editor that rewrites a file in place gets an error instead of silently
+    changing every project, while the usual write-and-rename saves just
+    break the link. gc() drops blobs no project links to any more.
+
+    The mode doesn't stop root (or tools that ignore it), so put() only
+    reuses a blob whose size and hash still match its name; one that was
+    edited in place is quarantined and stored afresh, and new projects
+    never link the edited content.
+    """
+
+    def __init__(self, root, reflink: bool = True):
+        self.root = Path(root)
+        self.reflink = reflink and sys.platform.startswith('linux')
+        # digest -> (inode, size, mtime_ns) when last hashed, to skip re-hashing unchanged blobs
+        self._verified = {}
+        self.quarantined = 0
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes, digest: str) -> Path:
+        """Store data under its digest (no-op if an intact copy is there), return the blob path"""
+        blob = self.path(digest)
+        try:
+            st = blob.stat()
+        except FileNotFoundError:
+            st = None
+        if st is not None and not self._intact(blob, st, digest, len(data)):
+            self._quarantine(blob, digest)
+            st = None
+        if st is None:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(f".{digest}.tmp-{uuid.uuid4().hex[:8]}")
+            tmp.write_bytes(data)
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, blob)
+        return blob
+
+    def _intact(self, blob: Path, st: os.stat_result, digest: str, size: int) -> bool:
+        if st.st_size != size:
+            return False
+        stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if self._verified.get(digest) == stamp:
+            return True
+        if hashlib.sha256(blob.read_bytes()).hexdigest() != digest:
+            return False
+        self._verified[digest] = stamp
+        return True
+
+    def _quarantine(self, blob: Path, digest: str):
+        """Move a modified blob aside; projects linking it keep their (edited) file"""
+        quarantine = self.root / QUARANTINE_DIR
+        quarantine.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(blob, quarantine / f"{digest}-{uuid.uuid4().hex[:8]}")
+        except FileNotFoundError:
+            pass
+        self._verified.pop(digest, None)
+        self.quarantined += 1
+
+    def materialize(self, data: bytes, digest: str, dest: Path, replace: bool = False):
+        """Create `dest` with this content, sharing storage with the blob if possible.
+
+        With replace=True an existing dest is swapped atomically.
+        """
+        target = dest.with_name(f".{dest.name}.tmp-{uuid.uuid4().hex[:8]}") if replace else dest
+        for attempt in range(2):
+            blob = self.put(data, digest)
+            try:
+                self._share(blob, target)
+                break
+            except FileNotFoundError:
+                # gc() removed the blob between put() and the link - store it again
+                if attempt:
+                    raise
+            except OSError as e:
+                if e.errno not in _NO_SHARE:
+                    raise
+                target.write_bytes(data)
+                break
+        if replace:
+            os.replace(target, dest)
+
+    def _share(self, blob: Path, target: Path):
+        if self.reflink:
+            try:
+                self._clone(blob, target)
+                return
+            except OSError as e:
+                if e.errno not in _NO_SHARE:
+                    raise
+                # Not supported here - don't try again on this store
+                self.reflink = False
+        os.link(blob, target)
+
+    @staticmethod
+    def _clone(blob: Path, target: Path):
+        import fcntl
+        src = os.open(blob, os.O_RDONLY)
+        try:
+            dst = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            try:
+                fcntl.ioctl(dst, FICLONE, src)
+            except OSError:
+                os.unlink(target)
+                raise
+            finally:
+                os.close(dst)
+        finally:
+            os.close(src)
+
+    def gc(self, min_age: float = 3600) -> dict:
+        """Remove blobs nothing links to any more.
+
+        A blob with a link count of 1 is only referenced by the store itself.
+        Blobs younger than `min_age` seconds are kept so a generation that
+        has stored but not yet linked them isn't raced.
+        """
+        removed = kept = freed = 0
+        cutoff = time.time() - min_age
+        if not self.root.exists():
+            return {'removed': 0, 'kept': 0, 'bytes_freed': 0}
+
+        for fanout in os.scandir(self.root):
+            if not fanout.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(fanout.path):
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                if st.st_nlink > 1 or st.st_mtime > cutoff:
+                    kept += 1
+                    continue
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+                removed += 1
+                freed += st.st_size
+            try:
+                os.rmdir(fanout.path)
+            except OSError:
+                pass  # not empty
+
+        return {'removed': removed, 'kept': kept, 'bytes_freed': freed}
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+CodeForge generation cache - reuse rendered projects for repeat ideas
+In-memory LRU in front of a size-capped on-disk store
+"""
+
+import os
+import re
+import json
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from codeforge_output import FileTree
+
+
+def normalize_idea(idea: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return re.sub(r'[\s.!?,;:]+$', '', ' '.join(idea.lower().split()))
+
+
+class GenerationCache:
+    """Rendered FileTrees keyed by normalized idea + parse result + template version.
+
+    Lookups hit the in-memory LRU first, then the on-disk store (one JSON
+    file per entry, shared by every process pointing at the same directory).
+    The disk store is capped at `max_bytes`; the least recently used entries
+    (by mtime, bumped on every hit) are evicted first. Because the template
+    version is part of the key, editing a template invalidates every entry.
+
+    A hit reuses the project exactly as it was first rendered, including the
+    original wording of the idea.
+    """
+
+    def __init__(self, directory, max_bytes: int = 256 * 1024 * 1024, memory_entries: int = 256):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = sum(e.stat().st_size for e in os.scandir(self.directory) if e.name.endswith('.json'))
+
+    @staticmethod
+    def key(parsed: dict, template_version: str) -> str:
+        """Cache key for the parse result of a normalized idea"""
+        material = json.dumps({
+            'idea': parsed['idea'],
+            'app_name': parsed['app_name'],
+            'features': parsed['features'],
+            'entities': parsed['entities'],
+            'templates': template_version,
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str):
+        """Return a copy of the cached FileTree, or None"""
+        with self._lock:
+            tree = self._memory.get(key)
+            if tree is not None:
+                self._memory.move_to_end(key)
+
+        if tree is None:
+            tree = self._load(key)
+            if tree is None:
+                self.misses += 1
+                return None
+            self._remember(key, tree)
+
+        self.hits += 1
+        return _copy(tree)
+
+    def put(self, key: str, tree: FileTree):
+        """Store a rendered tree in memory and on disk"""
+        tree = _copy(tree)
+        self._remember(key, tree)
+
+        data = json.dumps({
+            'name': tree.name,
+            'dirs': tree.dirs,
+            'files': {p: d.decode('utf-8', 'surrogateescape') for p, d in tree.files.items()},
+        }).encode('utf-8')
+
+        path = self._path(key)
+        tmp = path.with_name(f".{path.name}.tmp-{uuid.uuid4().hex[:8]}")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._disk_bytes += len(data)
+            over = self._disk_bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def _remember(self, key: str, tree: FileTree):
+        with self._lock:
+            self._memory[key] = tree
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _load(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        tree = FileTree(entry['name'])
+        tree.dirs = entry['dirs']
+        tree.files = {p: d.encode('utf-8', 'surrogateescape') for p, d in entry['files'].items()}
+        return tree
+
+    def _evict(self):
+        """Drop least recently used disk entries until under 90% of the cap"""
+        entries = []
+        for e in os.scandir(self.directory):
+            if e.name.endswith('.json'):
+                try:
+                    st = e.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, e.path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def clear(self):
+        """Forget everything, in memory and on disk"""
+        with self._lock:
+            self._memory.clear()
+            self._disk_bytes = 0
+        for e in os.scandir(self.directory):
+            if e.name.endswith('.json'):
+                os.remove(e.path)
+
+
+def _copy(tree: FileTree) -> FileTree:
+    copy = FileTree(tree.name)
+    copy.dirs = list(tree.dirs)
+    copy.files = dict(tree.files)
+    return copy
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+CodeForge app catalog - SQLite index of the projects under generated/
+Updated by the generator as projects finish, so listing never walks the tree
+"""
+
+import os
+import json
+import time
+import base64
+import sqlite3
+import threading
+from pathlib import Path
+
+CATALOG_NAME = '.codeforge-catalog.db'
+
+# sort name -> (column, descending)
+SORTS = {
+    'name': ('name', False),
+    'updated': ('updated', True),
+    'created': ('created', True),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apps (
+    name TEXT PRIMARY KEY,
+    app_name TEXT,
+    idea TEXT,
+    path TEXT NOT NULL,
+    files INTEGER,
+    has_frontend INTEGER NOT NULL,
+    has_backend INTEGER NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS apps_updated ON apps (updated, name);
+CREATE INDEX IF NOT EXISTS apps_created ON apps (created, name);
+CREATE TABLE IF NOT EXISTS app_features (
+    feature TEXT NOT NULL,
+    name TEXT NOT NULL REFERENCES apps (name) ON DELETE CASCADE,
+    PRIMARY KEY (feature, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS app_features_name ON app_features (name);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def short_feature(feature: str) -> str:
+    """has_auth -> auth, is_realtime -> realtime"""
+    return feature.replace('has_', '').replace('is_', '')
+
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> list:
+    """Raises ValueError for a malformed cursor"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+class AppCatalog:
+    """Projects of one generated/ directory, indexed in SQLite.
+
+    The generator records every finished project through `listener()`, so
+    queries only read the index. Projects added or removed by hand are
+    picked up by `refresh()`: it compares the directory's mtime with the one
+    seen last, and only when it moved lists the directory once to add new
+    entries and drop deleted ones. Safe to share between threads and
+    processes (one connection per thread, WAL journal).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.root = self.path.parent
+        self._local = threading.local()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def listener(self):
+        """Generation listener recording each finished project"""
+        state = threading.local()
+
+        def on_event(event: dict):
+            if event['event'] == 'start':
+                state.start = event
+                state.root_mtime_ns = None
+            elif event['event'] == 'stage_start' and event['stage'] == 'write':
+                state.root_mtime_ns = self._root_mtime_ns()
+            elif event['event'] == 'done' and event['location']:
+                start = getattr(state, 'start', {})
+                self.record(event['location'], app_name=event['app_name'], idea=start.get('idea'),
+                            features=start.get('features', []), files=event['files'],
+                            root_mtime_ns=getattr(state, 'root_mtime_ns', None))
+
+        return on_event
+
+    def record(self, location: str, app_name: str = None, idea: str = None, features: list = (),
+               files: int = None, root_mtime_ns: int = None):
+        """Add or update the project at `location` (ignored outside the catalog root).
+
+        `root_mtime_ns` is the directory's mtime from just before the project
+        was written; if refresh() had seen exactly that, the baseline moves
+        past this write, so the next query doesn't rescan for it.
+        """
+        location = Path(location)
+        if location.parent.resolve() != self.root.resolve():
+            return
+        now = time.time()
+        name = location.name
+        with self.db as db:
+            db.execute(
+                "INSERT INTO apps (name, app_name, idea, path, files, has_frontend, has_backend, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET app_name=excluded.app_name, idea=excluded.idea, "
+                "path=excluded.path, files=excluded.files, has_frontend=excluded.has_frontend, "
+                "has_backend=excluded.has_backend, updated=excluded.updated",
+                (name, app_name, idea, str(location.absolute()), files,
+                 (location / 'frontend').exists(), (location / 'backend').exists(), now, now),
+            )
+            db.execute("DELETE FROM app_features WHERE name = ?", (name,))
+            db.executemany("INSERT INTO app_features (feature, name) VALUES (?, ?)",
+                           [(short_feature(f), name) for f in features])
+            if root_mtime_ns is not None:
+                # Only our own write moved the directory since the last refresh():
+                # compare-and-set, so a by-hand change still triggers a rescan
+                db.execute("UPDATE meta SET value = ? WHERE key = 'root_mtime_ns' AND value = ?",
+                           (str(self._root_mtime_ns()), str(root_mtime_ns)))
+
+    def refresh(self) -> bool:
+        """Reconcile with the directory if it changed since last seen; True if it did"""
+        mtime_ns = self._root_mtime_ns()
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'root_mtime_ns'").fetchone()
+        if row is not None and row['value'] == str(mtime_ns):
+            return False
+
+        on_disk = {}
+        if mtime_ns is not None:
+            for entry in os.scandir(self.root):
+                # Hidden entries are the catalog itself and staging dirs
+                if not entry.name.startswith('.') and entry.is_dir():
+                    on_disk[entry.name] = entry
+
+        with self.db as db:
+            known = {r['name'] for r in db.execute("SELECT name FROM apps")}
+            db.executemany("DELETE FROM apps WHERE name = ?", [(n,) for n in known - on_disk.keys()])
+            for name in on_disk.keys() - known:
+                location = Path(on_disk[name].path)
+                if not (location / 'frontend').exists():
+                    continue
+                mtime = on_disk[name].stat().st_mtime
+                db.execute(
+                    "INSERT INTO apps (name, path, has_frontend, has_backend, created, updated) "
+                    "VALUES (?, ?, 1, ?, ?, ?)",
+                    (name, str(location.absolute()), (location / 'backend').exists(), mtime, mtime),
+                )
+            self._set_meta(db, 'root_mtime_ns', mtime_ns)
+        return True
+
+    def query(self, limit: int = 50, cursor: str = None, feature: str = None, sort: str = 'name') -> dict:
+        """One page of apps, as {'apps': [...], 'next_cursor': str or None}.
+
+        Keyset pagination: the cursor holds the sort value and name of the
+        last app returned, so every page is an index range scan. Raises
+        ValueError for an unknown sort or a malformed cursor.
+        """
+        if sort not in SORTS:
+            raise ValueError(f"Unknown sort, use one of: {', '.join(SORTS)}")
+        column, descending = SORTS[sort]
+        self.refresh()
+
+        sql = "SELECT apps.* FROM apps"
+        where, params = [], []
+        if feature:
+            sql += " JOIN app_features USING (name)"
+            where.append("app_features.feature = ?")
+            params.append(short_feature(feature))
+        if cursor:
+            value, name = decode_cursor(cursor)
+            if column == 'name':
+                where.append("apps.name > ?")
+                params.append(name)
+            else:
+                op = '<' if descending else '>'
+                where.append(f"(apps.{column} {op} ? OR (apps.{column} = ? AND apps.name > ?))")
+                params += [value, value, name]
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        order = f"apps.{column} {'DESC' if descending else 'ASC'}"
+        if column != 'name':
+            order += ", apps.name ASC"
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self.db.execute(sql, params).fetchall()
+        page = rows[:limit]
+        features = self._features([r['name'] for r in page])
+        apps = [{
+            'name': r['name'],
+            'app_name': r['app_name'],
+            'idea': r['idea'],
+            'path': r['path'],
+            'files': r['files'],
+            'features': features.get(r['name'], []),
+            'has_frontend': bool(r['has_frontend']),
+            'has_backend': bool(r['has_backend']),
+            'created': r['created'],
+            'updated': r['updated'],
+        } for r in page]
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            next_cursor = encode_cursor([last[column], last['name']])
+        return {'apps': apps, 'next_cursor': next_cursor}
+
+    def count(self, feature: str = None) -> int:
+        """Number of apps, or of apps with `feature`"""
+        self.refresh()
+        if feature:
+            return self.db.execute("SELECT COUNT(*) FROM app_features WHERE feature = ?",
+                                   (short_feature(feature),)).fetchone()[0]
+        return self.db.execute("SELECT COUNT(*) FROM apps").fetchone()[0]
+
+    def _features(self, names: list) -> dict:
+        if not names:
+            return {}
+        marks = ', '.join('?' * len(names))
+        features = {}
+        for r in self.db.execute(
+                f"SELECT name, feature FROM app_features WHERE name IN ({marks}) ORDER BY feature", names):
+            features.setdefault(r['name'], []).append(r['feature'])
+        return features
+
+    def _root_mtime_ns(self):
+        try:
+            return os.stat(self.root).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _set_meta(db, key: str, value):
+        db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
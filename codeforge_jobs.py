@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+CodeForge job queue - run generations on a bounded in-process worker pool
+Used by codeforge_web.py so requests never wait on a generation
+"""
+
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from codeforge import generate_one
+from codeforge_cache import normalize_idea
+from codeforge_metrics import JOBS_SUBMITTED, WORKER_RESTARTS, record_event
+
+# Job states: queued -> running -> done | failed
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when every worker and queue slot is taken"""
+
+
+class Job:
+    """One generation request, its progress events and its outcome"""
+
+    def __init__(self, idea: str, output_dir: str = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.idea = idea
+        self.output_dir = output_dir
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        # Callers sharing this job (see JobQueue single-flight)
+        self.requests = 1
+        self.events = []
+        self._changed = threading.Condition()
+
+    def record(self, event: dict):
+        """Generation listener: keep the event and wake up readers"""
+        with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    def _finish(self, status: str, result: dict):
+        with self._changed:
+            self.status = status
+            self.result = result
+            self.finished = time.time()
+            self.events.append({'event': 'result', 'ts': self.finished, 'status': status, **result})
+            self._changed.notify_all()
+
+    def wait_events(self, since: int, timeout: float = None) -> list:
+        """Events after the first `since`, blocking up to `timeout` seconds for new ones.
+
+        Returns an empty list on timeout, or once the job has finished and
+        every event has been read.
+        """
+        with self._changed:
+            if len(self.events) <= since and self.finished is None:
+                self._changed.wait(timeout)
+            return self.events[since:]
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'idea': self.idea,
+            'status': self.status,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'requests': self.requests,
+            'result': self.result,
+        }
+
+
+class JobQueue:
+    """Bounded pool of generator threads.
+
+    At most `workers` jobs run at once and at most `max_queued` more wait
+    for a worker; submit() raises QueueFull beyond that instead of letting
+    the backlog grow. Results are the structured dicts of generate_one().
+    The last `history` finished jobs stay available for status lookups.
+
+    Submissions are single-flight: while a job for the same normalized idea
+    and output directory is queued or running, submit() returns that job
+    instead of starting another, so the project is rendered and written once
+    and every caller gets the same result.
+    """
+
+    def __init__(self, workers: int = 4, max_queued: int = 32, cache_dir: str = None, history: int = 1000,
+                 catalog_path: str = None, blobs_dir: str = None):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.cache_dir = cache_dir
+        self.catalog_path = catalog_path
+        self.blobs_dir = blobs_dir
+        self.history = history
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='codeforge-job')
+        self._slots = threading.BoundedSemaphore(workers + max_queued)
+        self._jobs = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, idea: str, output_dir: str = None) -> Job:
+        """Queue a generation (or join the identical one in flight), return its Job.
+
+        Raises QueueFull if a new job is needed and there is no room.
+        """
+        key = (normalize_idea(idea), output_dir)
+        with self._lock:
+            job = self._in_flight.get(key)
+            if job is not None:
+                job.requests += 1
+                JOBS_SUBMITTED.inc('shared')
+                return job
+
+            if not self._slots.acquire(blocking=False):
+                JOBS_SUBMITTED.inc('rejected')
+                raise QueueFull(f"{self.workers + self.max_queued} jobs already queued or running")
+            job = Job(idea, output_dir)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+
+        try:
+            self._pool.submit(self._run, job, key)
+        except RuntimeError:
+            # Pool shut down
+            with self._lock:
+                del self._in_flight[key]
+            self._slots.release()
+            raise
+        JOBS_SUBMITTED.inc('queued')
+        return job
+
+    def get(self, job_id: str):
+        """The Job with this id, or None if unknown or expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        """Number of jobs per state"""
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def _run(self, job: Job, key: tuple):
+        job.status = RUNNING
+        job.started = time.time()
+        try:
+            result = generate_one(job.idea, job.output_dir, self.cache_dir, listeners=[job.record, record_event],
+                                  catalog_path=self.catalog_path, blobs_dir=self.blobs_dir)
+            job._finish(FAILED if result['error'] else DONE, result)
+        except Exception as e:
+            WORKER_RESTARTS.inc()
+            job._finish(FAILED, {'idea': job.idea, 'error': f"{type(e).__name__}: {e}"})
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            self._slots.release()
+            self._expire()
+
+    def _expire(self):
+        """Forget the oldest finished jobs beyond `history`"""
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.finished is not None]
+            for job_id in finished[:max(0, len(finished) - self.history)]:
+                del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+CodeForge keyword matcher - detects features in an idea in one pass
+Compiled once from a lexicon file (see codeforge_lexicon.json)
+"""
+
+import re
+import json
+from pathlib import Path
+
+DEFAULT_LEXICON = Path(__file__).parent / 'codeforge_lexicon.json'
+
+
+def _trie_pattern(words) -> str:
+    """Build a regex that walks a prefix trie of `words`.
+
+    Each match attempt is a single walk down the trie instead of trying every
+    alternative, and greedy optional groups make it pick the longest keyword
+    starting at a position.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+class _TokenCache(dict):
+    """token -> frozenset of features, computed on first lookup"""
+
+    def __init__(self, compute, maxsize: int):
+        super().__init__()
+        self.compute = compute
+        self.maxsize = maxsize
+
+    def __missing__(self, token):
+        if len(self) >= self.maxsize:
+            self.clear()
+        value = self[token] = self.compute(token)
+        return value
+
+
+class KeywordMatcher:
+    """Single-pass substring matcher for feature keywords.
+
+    Matches the same way as `any(word in text for word in keywords)` per
+    feature, but without one scan per keyword. A keyword without whitespace
+    can only occur inside a single whitespace-separated token, so an idea's
+    features are the union of its tokens' features, and those are memoized:
+    in bulk classification almost every token is a dict hit. Unseen tokens
+    (and phrase keywords containing spaces) go through a regex compiled from
+    a prefix trie of the keywords, whose lookahead finds the longest keyword
+    starting at every position; shorter keywords starting there are prefixes
+    of it, so their features are folded in up front.
+    """
+
+    def __init__(self, lexicon: dict, token_cache_size: int = 100_000):
+        self.features = list(lexicon['features'])
+        self.stopwords = frozenset(lexicon.get('stopwords', []))
+
+        keyword_features = {}
+        for feature, keywords in lexicon['features'].items():
+            for keyword in keywords:
+                if keyword:
+                    keyword_features.setdefault(keyword.lower(), set()).add(feature)
+
+        self._hits = {}
+        for keyword in keyword_features:
+            hits = set()
+            for i in range(1, len(keyword) + 1):
+                hits |= keyword_features.get(keyword[:i], set())
+            self._hits[keyword] = frozenset(hits)
+
+        words = [k for k in keyword_features if not any(ch.isspace() for ch in k)]
+        phrases = [k for k in keyword_features if k not in words]
+        self._pattern = self._compile(words)
+        self._phrase_pattern = self._compile(phrases) if phrases else None
+        self._token_features = _TokenCache(self._features_in, token_cache_size)
+
+    @staticmethod
+    def _compile(keywords):
+        pattern = _trie_pattern(keywords) if keywords else '(?!)'
+        return re.compile(f'(?=({pattern}))')
+
+    def _features_in(self, text: str) -> frozenset:
+        keywords = self._pattern.findall(text)
+        if not keywords:
+            return frozenset()
+        return frozenset().union(*map(self._hits.__getitem__, keywords))
+
+    @classmethod
+    def from_file(cls, path) -> 'KeywordMatcher':
+        """Load a lexicon JSON file"""
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def match(self, text_lower: str, tokens: list = None) -> set:
+        """Return the set of features whose keywords occur in the text"""
+        if tokens is None:
+            tokens = text_lower.split()
+        found = set().union(*map(self._token_features.__getitem__, tokens))
+        if self._phrase_pattern is not None:
+            for keyword in self._phrase_pattern.findall(text_lower):
+                found |= self._hits[keyword]
+        return found
+
+    def scan(self, idea: str):
+        """Parse an idea in one pass.
+
+        Returns (features, entities, name_keywords): a feature -> bool dict,
+        the first 3 entity words, and the first 2 words usable in an app name.
+        """
+        idea_lower = idea.lower()
+        tokens = idea_lower.split()
+        found = self.match(idea_lower, tokens)
+        features = {feature: feature in found for feature in self.features}
+
+        words = [w for w in tokens if len(w) > 3]
+        entities = [w for w in words if w not in self.stopwords][:3]
+        name_keywords = [w for w in words if w.isalnum()][:2]
+
+        return features, entities, name_keywords
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+CodeForge metrics - in-process counters and histograms, Prometheus text output
+Updates touch only per-thread state, so recording never takes a shared lock
+"""
+
+import bisect
+import threading
+
+# Seconds; generator stages are usually well under a millisecond
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Sharded:
+    """Per-thread value dicts, merged when read.
+
+    Each thread only ever writes its own dict, so an update is a plain dict
+    operation with no lock. A lock is taken only the first time a thread
+    records something and when metrics are collected; shards of threads
+    that have exited are folded into `_retired` so per-request threads
+    don't pile up.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), values))
+            return values
+
+    def _merge(self, into: dict, values: dict):
+        raise NotImplementedError
+
+    def _collect(self) -> dict:
+        with self._lock:
+            live = []
+            for thread, values in self._shards:
+                if thread.is_alive():
+                    live.append((thread, values))
+                else:
+                    self._merge(self._retired, values.copy())
+            self._shards = live
+            merged = {}
+            self._merge(merged, self._retired)
+            for _, values in live:
+                self._merge(merged, values.copy())
+        return merged
+
+
+class Counter(_Sharded):
+    """Monotonic counter, optionally split by label values"""
+
+    type = 'counter'
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        super().__init__()
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+    def inc(self, *label_values, amount: float = 1):
+        values = self._shard()
+        values[label_values] = values.get(label_values, 0) + amount
+
+    def _merge(self, into: dict, values: dict):
+        for key, value in values.items():
+            into[key] = into.get(key, 0) + value
+
+    def values(self) -> dict:
+        """label values tuple -> total"""
+        return self._collect()
+
+    def total(self) -> float:
+        return sum(self._collect().values())
+
+    def render(self) -> list:
+        values = self._collect()
+        if not values and not self.labels:
+            values = {(): 0}
+        return [f"{self.name}{_labels(self.labels, key)} {_number(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Histogram(_Sharded):
+    """Distribution of observed values over fixed buckets"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, buckets: tuple = STAGE_BUCKETS, labels: tuple = ()):
+        super().__init__()
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.labels = labels
+
+    def observe(self, value: float, *label_values):
+        values = self._shard()
+        series = values.get(label_values)
+        if series is None:
+            # one count per bucket plus +Inf, then sum
+            series = values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def _merge(self, into: dict, values: dict):
+        for key, series in values.items():
+            series = list(series)
+            if key in into:
+                into[key] = [a + b for a, b in zip(into[key], series)]
+            else:
+                into[key] = series
+
+    def render(self) -> list:
+        lines = []
+        for key, series in sorted(self._collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at collection time"""
+
+    type = 'gauge'
+
+    def __init__(self, name: str, help: str, fn):
+        self.name = name
+        self.help = help
+        self.fn = fn
+
+    def render(self) -> list:
+        return [f"{self.name} {_number(self.fn())}"]
+
+
+class Registry:
+    """Named metrics, rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            # Re-registering (e.g. a reloaded module) replaces the old metric
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, buckets: tuple = STAGE_BUCKETS, labels: tuple = ()) -> Histogram:
+        return self._add(Histogram(name, help, buckets, labels))
+
+    def gauge(self, name: str, help: str, fn) -> Gauge:
+        return self._add(Gauge(name, help, fn))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+GENERATIONS = REGISTRY.counter(
+    'codeforge_generations_total', 'Finished generations by outcome', ('status',))
+STAGE_SECONDS = REGISTRY.histogram(
+    'codeforge_stage_duration_seconds', 'Wall time per generator stage', labels=('stage',))
+BYTES_WRITTEN = REGISTRY.counter(
+    'codeforge_bytes_written_total', 'Bytes written by sinks (unchanged files excluded)')
+FILES_WRITTEN = REGISTRY.counter(
+    'codeforge_files_written_total', 'Files written by sinks (unchanged files excluded)')
+CACHE_LOOKUPS = REGISTRY.counter(
+    'codeforge_cache_lookups_total', 'Render cache lookups by result', ('result',))
+REGISTRY.gauge(
+    'codeforge_cache_hit_ratio', 'Render cache hits / lookups since start',
+    lambda: CACHE_LOOKUPS.values().get(('hit',), 0) / (CACHE_LOOKUPS.total() or 1))
+JOBS_SUBMITTED = REGISTRY.counter(
+    'codeforge_jobs_submitted_total', 'Job submissions: queued, shared (joined one in flight) or rejected',
+    ('outcome',))
+WORKER_RESTARTS = REGISTRY.counter(
+    'codeforge_worker_restarts_total', 'Jobs that crashed their worker outside the generator')
+
+
+def record_event(event: dict):
+    """Generation listener feeding the metrics above"""
+    kind = event['event']
+    if kind == 'stage':
+        STAGE_SECONDS.observe(event['duration_ms'] / 1000, event['stage'])
+    elif kind == 'done':
+        GENERATIONS.inc('done')
+        BYTES_WRITTEN.inc(amount=event['bytes_written'])
+        FILES_WRITTEN.inc(amount=event['files_changed'])
+    elif kind == 'error':
+        GENERATIONS.inc('failed')
+    elif kind == 'cache':
+        CACHE_LOOKUPS.inc('hit' if event['hit'] else 'miss')
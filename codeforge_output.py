@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+CodeForge output layer - in-memory file tree and sinks that flush it
+Only touches files whose content actually changed
+"""
+
+import io
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+MANIFEST_NAME = '.codeforge-manifest.json'
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 hex digest of file content"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class FileTree:
+    """Rendered project held in memory: relative path -> bytes, plus empty dirs.
+
+    `name` is the project directory name, used as the top-level folder when
+    the tree is packed into an archive.
+    """
+
+    def __init__(self, name: str = None):
+        self.name = name
+        self.files = {}
+        self.dirs = []
+
+    def mkdir(self, relpath: str):
+        """Add a (possibly empty) directory"""
+        self.dirs.append(relpath)
+
+    def write(self, relpath: str, content):
+        """Add or replace a file"""
+        self.files[relpath] = content.encode('utf-8') if isinstance(content, str) else content
+
+    def all_dirs(self) -> list:
+        """Every directory the tree needs, parents first"""
+        dirs = set()
+        for relpath in self.dirs + [os.path.dirname(p) for p in self.files]:
+            while relpath and relpath not in dirs:
+                dirs.add(relpath)
+                relpath = os.path.dirname(relpath)
+        return sorted(dirs)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(len(data) for data in self.files.values())
+
+    def __len__(self):
+        return len(self.files)
+
+
+class DirectorySink:
+    """Flushes a FileTree into a project directory.
+
+    A new project is written into a hidden staging directory next to the
+    target and moved into place with a single rename, so readers never see
+    a half-written project. An existing project is updated incrementally:
+    each file is hashed and compared with the project manifest (digest,
+    size and mtime recorded at the last write) or, failing that, with the
+    bytes on disk, and only changed files are replaced (each via an atomic
+    rename). Unchanged files keep their mtimes, so file watchers don't
+    restart. Larger flushes are spread over a small thread pool; on a local
+    disk the handoff costs more than it saves for a handful of files, but on
+    network filesystems it hides per-write latency.
+
+    With a BlobStore (see codeforge_blobs.py) files are reflinked or
+    hardlinked from the store instead of written, so identical files across
+    projects share storage.
+    """
+
+    def __init__(self, root, workers: int = 8, parallel_min_files: int = 16, blobs=None):
+        self.root = Path(root)
+        self.workers = workers
+        self.parallel_min_files = parallel_min_files
+        self.blobs = blobs
+
+    @property
+    def location(self) -> str:
+        return str(self.root.absolute())
+
+    def flush(self, tree: FileTree, on_file=None) -> dict:
+        """Write the tree, return a report of what changed.
+
+        on_file(relpath, size) is called for every file actually written,
+        possibly from writer threads.
+        """
+        if not self.root.exists():
+            report = self._flush_new(tree, on_file)
+            if report is not None:
+                return report
+        return self._flush_existing(tree, on_file)
+
+    def _flush_new(self, tree: FileTree, on_file):
+        self.root.parent.mkdir(parents=True, exist_ok=True)
+        staging = self.root.parent / f".{self.root.name}.tmp-{uuid.uuid4().hex[:8]}"
+        try:
+            staging.mkdir()
+            for relpath in tree.all_dirs():
+                (staging / relpath).mkdir()
+
+            manifest = dict(self._write_all(staging, tree.files.items(), replace=False, on_file=on_file))
+            self._save_manifest(staging, manifest)
+
+            os.rename(staging, self.root)
+        except OSError:
+            # Somebody else created the project meanwhile - update it in place
+            shutil.rmtree(staging, ignore_errors=True)
+            if self.root.exists():
+                return None
+            raise
+
+        return _report(len(tree), 0, tree.total_bytes)
+
+    def _flush_existing(self, tree: FileTree, on_file) -> dict:
+        manifest = self._load_manifest()
+        manifest_dirty = False
+
+        changed = []
+        for relpath, data in tree.files.items():
+            digest = content_hash(data)
+            state = self._disk_state(relpath, data, digest, manifest.get(relpath))
+            if state is None:
+                changed.append((relpath, data))
+            elif state is not True:
+                # Identical on disk but not (or stale) in the manifest
+                manifest[relpath] = state
+                manifest_dirty = True
+
+        if changed:
+            for relpath in tree.all_dirs():
+                (self.root / relpath).mkdir(exist_ok=True)
+            manifest.update(self._write_all(self.root, changed, replace=True, on_file=on_file))
+            manifest_dirty = True
+
+        if manifest_dirty:
+            self._save_manifest(self.root, manifest)
+
+        bytes_written = sum(len(data) for _, data in changed)
+        return _report(len(changed), len(tree) - len(changed), bytes_written)
+
+    def _disk_state(self, relpath: str, data: bytes, digest: str, entry):
+        """True if unchanged per manifest, a fresh manifest entry if unchanged
+        per disk contents, None if the file must be written"""
+        path = self.root / relpath
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        if st.st_size != len(data):
+            return None
+
+        if entry and entry.get('sha256') == digest and entry.get('mtime_ns') == st.st_mtime_ns:
+            return True
+
+        # No (or stale) manifest entry - fall back to comparing bytes on disk
+        if path.read_bytes() != data:
+            return None
+        return self._entry(digest, st)
+
+    def _write_all(self, base: Path, items, replace: bool, on_file=None) -> list:
+        """Write (relpath, data) pairs under base, return manifest entries"""
+        items = list(items)
+
+        def write_one(item):
+            relpath, data = item
+            path = base / relpath
+            digest = content_hash(data)
+            if self.blobs is not None:
+                self.blobs.materialize(data, digest, path, replace=replace)
+            elif replace:
+                tmp = path.with_name(f".{path.name}.tmp-{uuid.uuid4().hex[:8]}")
+                tmp.write_bytes(data)
+                os.replace(tmp, path)
+            else:
+                path.write_bytes(data)
+            if on_file:
+                on_file(relpath, len(data))
+            return relpath, self._entry(digest, path.stat())
+
+        if self.workers <= 1 or len(items) < max(2, self.parallel_min_files):
+            return [write_one(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as pool:
+            return list(pool.map(write_one, items))
+
+    @staticmethod
+    def _entry(digest: str, st) -> dict:
+        return {'sha256': digest, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.root / MANIFEST_NAME) as f:
+                manifest = json.load(f)
+            return manifest if isinstance(manifest, dict) else {}
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_manifest(base: Path, manifest: dict):
+        path = base / MANIFEST_NAME
+        tmp = path.with_name(f"{MANIFEST_NAME}.tmp-{uuid.uuid4().hex[:8]}")
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+
+
+
+def _report(files_changed: int, files_unchanged: int, bytes_written: int) -> dict:
+    return {
+        'files_changed': files_changed,
+        'files_unchanged': files_unchanged,
+        'bytes_written': bytes_written,
+    }
+
+
+def _archive_path(tree: FileTree, relpath: str) -> str:
+    return f"{tree.name}/{relpath}" if tree.name else relpath
+
+
+class ZipSink:
+    """Packs a FileTree into a zip archive written to `stream`.
+
+    The stream only needs a write() method - zipfile falls back to data
+    descriptors on unseekable streams, so this works on sockets and pipes
+    and nothing touches the filesystem.
+    """
+
+    location = None
+
+    def __init__(self, stream, compression: int = zipfile.ZIP_DEFLATED):
+        self.stream = stream
+        self.compression = compression
+
+    def flush(self, tree: FileTree, on_file=None) -> dict:
+        date_time = time.localtime()[:6]
+        with zipfile.ZipFile(self.stream, 'w', compression=self.compression) as archive:
+            for relpath in tree.all_dirs():
+                archive.writestr(zipfile.ZipInfo(_archive_path(tree, relpath) + '/', date_time), b'')
+            for relpath, data in tree.files.items():
+                info = zipfile.ZipInfo(_archive_path(tree, relpath), date_time)
+                info.compress_type = self.compression
+                info.external_attr = 0o644 << 16
+                archive.writestr(info, data)
+                if on_file:
+                    on_file(relpath, len(data))
+        return _report(len(tree), 0, tree.total_bytes)
+
+
+class TarSink:
+    """Packs a FileTree into a tar archive (gzip by default) written to `stream`.
+
+    Uses tarfile's streaming mode, so the stream may be unseekable.
+    """
+
+    location = None
+
+    def __init__(self, stream, compression: str = 'gz'):
+        self.stream = stream
+        self.compression = compression
+
+    def flush(self, tree: FileTree, on_file=None) -> dict:
+        mtime = int(time.time())
+        with tarfile.open(fileobj=self.stream, mode=f"w|{self.compression}") as archive:
+            for relpath in tree.all_dirs():
+                info = tarfile.TarInfo(_archive_path(tree, relpath))
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                info.mtime = mtime
+                archive.addfile(info)
+            for relpath, data in tree.files.items():
+                info = tarfile.TarInfo(_archive_path(tree, relpath))
+                info.size = len(data)
+                info.mode = 0o644
+                info.mtime = mtime
+                archive.addfile(info, io.BytesIO(data))
+                if on_file:
+                    on_file(relpath, len(data))
+        return _report(len(tree), 0, tree.total_bytes)
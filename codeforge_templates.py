@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+CodeForge template registry - loads stack templates from templates/<stack>/
+Each template is compiled once and cached for the life of the process
+"""
+
+import re
+import hashlib
+import threading
+from pathlib import Path
+
+TEMPLATES_DIR = Path(__file__).parent / 'templates'
+DEFAULT_STACK = 'react-express'
+TEMPLATE_SUFFIX = '.tmpl'
+
+# {% name %} placeholders; everything else is literal text
+PLACEHOLDER = re.compile(r'\{%\s*(\w+)\s*%\}')
+
+
+def compile_template(source: str, filename: str = '<template>'):
+    """Compile template source into a render(context) -> str function.
+
+    The literal segments become constants of a generated code object, so a
+    render is one ''.join() of those constants and the context values; its
+    cost doesn't depend on re-parsing the template text.
+    """
+    parts = PLACEHOLDER.split(source)
+    # split() alternates literal text and placeholder names
+    pieces = [f"ctx[{part!r}]" if i % 2 else repr(part) for i, part in enumerate(parts) if i % 2 or part]
+    code = f"def render(ctx):\n    return ''.join(({', '.join(pieces or ['str()'])},))\n"
+    namespace = {}
+    exec(compile(code, filename, 'exec'), namespace)
+    return namespace['render']
+
+
+class TemplateRegistry:
+    """Templates of one stack, keyed by the output path they render to.
+
+    templates/<stack>/frontend/src/App.jsx.tmpl renders frontend/src/App.jsx.
+    Files are read and compiled lazily on first use, so adding stacks or
+    templates costs nothing at import time.
+    """
+
+    _registries = {}
+    _registries_lock = threading.Lock()
+
+    def __init__(self, stack_dir):
+        self.stack_dir = Path(stack_dir)
+        self._compiled = {}
+        self._version = None
+
+    @classmethod
+    def for_stack(cls, stack: str = DEFAULT_STACK) -> 'TemplateRegistry':
+        """Shared registry for a stack under templates/"""
+        with cls._registries_lock:
+            if stack not in cls._registries:
+                cls._registries[stack] = cls(TEMPLATES_DIR / stack)
+            return cls._registries[stack]
+
+    def render(self, name: str, context: dict) -> str:
+        """Render the template for output path `name`"""
+        render = self._compiled.get(name)
+        if render is None:
+            path = self.stack_dir / (name + TEMPLATE_SUFFIX)
+            render = self._compiled[name] = compile_template(path.read_text(encoding='utf-8'), str(path))
+        return render(context)
+
+    def names(self) -> list:
+        """Output paths of every template in the stack"""
+        return sorted(
+            str(path.relative_to(self.stack_dir))[:-len(TEMPLATE_SUFFIX)]
+            for path in self.stack_dir.rglob('*' + TEMPLATE_SUFFIX)
+        )
+
+    @property
+    def version(self) -> str:
+        """Fingerprint of every template file, for cache invalidation"""
+        if self._version is None:
+            digest = hashlib.sha256()
+            for name in self.names():
+                digest.update(name.encode('utf-8') + b'\0')
+                digest.update((self.stack_dir / (name + TEMPLATE_SUFFIX)).read_bytes() + b'\0')
+            self._version = digest.hexdigest()[:16]
+        return self._version
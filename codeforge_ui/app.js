@@ -0,0 +1,234 @@
+// CodeForge Web UI - queues a generation job and follows its progress over SSE
+
+const $ = (id) => document.getElementById(id);
+
+// Loading step (index into .loading-step) reached by each generator stage
+const STAGE_STEPS = {
+  parse: 0,
+  structure: 0,
+  frontend: 1,
+  backend: 2,
+  database: 3,
+  deploy: 4,
+  readme: 4,
+  write: 4,
+};
+
+const STAGE_LABELS = {
+  parse: 'Analyzing your idea...',
+  structure: 'Building structure...',
+  frontend: 'Generating React frontend...',
+  backend: 'Generating Express backend...',
+  database: 'Creating Supabase schema...',
+  deploy: 'Creating deploy configs...',
+  readme: 'Writing README...',
+  write: 'Writing files...',
+};
+
+const EXAMPLES = {
+  'Productivity': [
+    'Pomodoro timer with task tracking',
+    'A tool to track my daily habits',
+    'Todo list with due dates and reminders',
+  ],
+  'Social': [
+    'Chat app with rooms and file uploads',
+    'Recipe sharing with comments and likes',
+  ],
+  'Business': [
+    'Expense tracker with categories',
+    'URL shortener with analytics dashboard',
+    'Inventory manager with search',
+  ],
+};
+
+let source = null;
+let generatedCount = 0;
+
+function showView(name) {
+  document.querySelectorAll('.nav-item').forEach((item) => {
+    item.classList.toggle('active', item.dataset.view === name);
+  });
+  document.querySelectorAll('.view').forEach((view) => {
+    view.classList.toggle('active', view.id === `${name}-view`);
+  });
+  if (name === 'my-apps') loadApps();
+}
+
+function setStep(index) {
+  document.querySelectorAll('.loading-step').forEach((step, i) => {
+    step.classList.toggle('active', i <= index);
+  });
+}
+
+function showLoading() {
+  $('result-container').style.display = 'none';
+  $('loading-container').style.display = 'block';
+  $('loading-status').textContent = STAGE_LABELS.parse;
+  setStep(0);
+}
+
+function showError(message) {
+  $('loading-container').style.display = 'none';
+  $('generate-btn').disabled = false;
+  alert(`Generation failed: ${message}`);
+}
+
+function showResult(result) {
+  $('loading-container').style.display = 'none';
+  $('result-container').style.display = 'block';
+  $('generate-btn').disabled = false;
+
+  const slug = (result.app_name || 'your-app').toLowerCase();
+  $('result-app-name').textContent = result.app_name || '-';
+  $('result-location').textContent = result.path || '-';
+  $('local-commands').textContent = [
+    `cd generated/${slug}`,
+    'cd backend && npm install && node server.js &',
+    'cd frontend && npm install && npm run dev',
+  ].join('\n');
+
+  generatedCount += 1;
+  $('total-generated').textContent = generatedCount;
+}
+
+function followJob(jobId) {
+  if (source) source.close();
+  source = new EventSource(`/jobs/${jobId}/events`);
+
+  source.addEventListener('stage_start', (e) => {
+    const { stage } = JSON.parse(e.data);
+    setStep(STAGE_STEPS[stage] ?? 0);
+    $('loading-status').textContent = STAGE_LABELS[stage] || stage;
+  });
+
+  source.addEventListener('file', (e) => {
+    const { path, bytes } = JSON.parse(e.data);
+    $('loading-status').textContent = `📝 ${path} (${bytes} bytes)`;
+  });
+
+  source.addEventListener('cache', (e) => {
+    if (JSON.parse(e.data).hit) $('loading-status').textContent = '⚡ Reusing a cached render...';
+  });
+
+  source.addEventListener('result', (e) => {
+    source.close();
+    source = null;
+    const result = JSON.parse(e.data);
+    if (result.error) showError(result.error);
+    else showResult(result);
+  });
+
+  source.onerror = () => {
+    // EventSource reconnects (resuming after the last event id) unless closed
+    if (source && source.readyState === EventSource.CLOSED) {
+      source = null;
+      showError('lost connection to the server');
+    }
+  };
+}
+
+async function generate() {
+  const idea = $('app-idea').value.trim();
+  if (!idea) {
+    $('app-idea').focus();
+    return;
+  }
+
+  $('generate-btn').disabled = true;
+  showLoading();
+
+  try {
+    const response = await fetch('/generate', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ idea }),
+    });
+    const data = await response.json();
+    if (!response.ok) {
+      showError(data.error || response.statusText);
+      return;
+    }
+    followJob(data.job_id);
+  } catch (err) {
+    showError(err.message);
+  }
+}
+
+async function loadApps() {
+  try {
+    const response = await fetch('/apps');
+    const { apps, total } = await response.json();
+    $('apps-count').textContent = total;
+    if (!apps.length) return;
+
+    const grid = $('apps-grid');
+    grid.replaceChildren(...apps.map((app) => {
+      const card = document.createElement('div');
+      card.className = 'app-card';
+      const title = document.createElement('h3');
+      title.textContent = app.name;
+      const path = document.createElement('p');
+      path.textContent = app.path;
+      card.append(title, path);
+      return card;
+    }));
+  } catch (err) {
+    console.error('Failed to load apps', err);
+  }
+}
+
+function renderExamples() {
+  const container = $('examples-container');
+  for (const [category, ideas] of Object.entries(EXAMPLES)) {
+    const section = document.createElement('div');
+    section.className = 'example-category';
+    const heading = document.createElement('h3');
+    heading.textContent = category;
+    const items = document.createElement('div');
+    items.className = 'example-items';
+    for (const idea of ideas) {
+      const item = document.createElement('div');
+      item.className = 'example-item';
+      item.textContent = idea;
+      item.addEventListener('click', () => {
+        $('app-idea').value = idea;
+        showView('generator');
+      });
+      items.append(item);
+    }
+    section.append(heading, items);
+    container.append(section);
+  }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+  document.querySelectorAll('.nav-item').forEach((item) => {
+    item.addEventListener('click', () => showView(item.dataset.view));
+  });
+
+  document.querySelectorAll('.copy-btn').forEach((button) => {
+    button.addEventListener('click', () => {
+      navigator.clipboard.writeText($(button.dataset.copy).textContent.trim());
+    });
+  });
+
+  $('generate-btn').addEventListener('click', generate);
+  $('app-idea').addEventListener('keydown', (e) => {
+    if (e.key === 'Enter' && (e.metaKey || e.ctrlKey)) generate();
+  });
+  $('close-result').addEventListener('click', () => {
+    $('result-container').style.display = 'none';
+  });
+  $('generate-another').addEventListener('click', () => {
+    $('result-container').style.display = 'none';
+    $('app-idea').value = '';
+    $('app-idea').focus();
+  });
+  $('open-folder').addEventListener('click', () => {
+    navigator.clipboard.writeText($('result-location').textContent);
+  });
+
+  renderExamples();
+  loadApps();
+});
@@ -3,81 +3,245 @@
 CodeForge Web UI - Generate apps from browser
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
-import subprocess
+import threading
+import queue
+import json
 import os
 from pathlib import Path
 
-app = Flask(__name__, static_folder='codeforge_ui')
+from codeforge import CodeForge, ZipSink, TarSink, BLOBS_DIR
+from codeforge_catalog import AppCatalog, CATALOG_NAME
+from codeforge_jobs import JobQueue, QueueFull, QUEUED, RUNNING
+from codeforge_metrics import REGISTRY, record_event
+
+BASE_DIR = Path(__file__).parent
+GENERATED_DIR = BASE_DIR / 'generated'
+UI_DIR = BASE_DIR / 'codeforge_ui'
+
+app = Flask(__name__, static_folder=str(UI_DIR))
 CORS(app)
 
+catalog = AppCatalog(GENERATED_DIR / CATALOG_NAME)
+
+# Generation runs on this pool, never in the request thread
+jobs = JobQueue(
+    workers=int(os.getenv('CODEFORGE_WORKERS', '4')),
+    max_queued=int(os.getenv('CODEFORGE_MAX_QUEUED', '32')),
+    cache_dir=os.getenv('CODEFORGE_CACHE_DIR'),
+    catalog_path=str(catalog.path),
+    blobs_dir=str(GENERATED_DIR / BLOBS_DIR) if os.getenv('CODEFORGE_DEDUP') == '1' else None,
+)
+_forge = CodeForge(quiet=True)
+
+REGISTRY.gauge('codeforge_jobs_queued', 'Jobs waiting for a worker', lambda: jobs.stats()[QUEUED])
+REGISTRY.gauge('codeforge_jobs_in_flight', 'Jobs being generated right now', lambda: jobs.stats()[RUNNING])
+REGISTRY.gauge('codeforge_job_capacity', 'Workers plus queue slots', lambda: jobs.workers + jobs.max_queued)
+
 @app.route('/')
 def index():
-    return send_from_directory('codeforge_ui', 'index.html')
+    return send_from_directory(UI_DIR, 'index.html')
 
 @app.route('/generate', methods=['POST'])
 def generate():
-    """Generate app from idea"""
-    data = request.json
+    """Queue a generation job, return its id (poll GET /jobs/<id> for the result)"""
+    data = request.get_json(silent=True) or {}
     idea = data.get('idea', '')
     
     if not idea:
         return jsonify({'error': 'Idea is required'}), 400
     
+    app_name = _forge.parse_idea(idea)['app_name']
     try:
-        # Run codeforge.py
-        result = subprocess.run(
-            ['/Users/sravyalu/uniforge/.venv/bin/python', 'codeforge.py', idea],
-            cwd='/Users/sravyalu/uniforge',
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        # Parse output to get app name and location
-        output = result.stdout
-        
-        # Extract app name from output
-        app_name = None
-        location = None
-        for line in output.split('\n'):
-            if line.startswith('📦 Generating:'):
-                app_name = line.split(':')[1].strip()
-            elif line.startswith('   /Users/'):
-                location = line.strip()
-        
-        return jsonify({
-            'success': True,
-            'app_name': app_name,
-            'location': location,
-            'output': output
-        })
-    
-    except subprocess.TimeoutExpired:
-        return jsonify({'error': 'Generation timed out'}), 500
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        job = jobs.submit(idea, str(GENERATED_DIR / app_name.lower()))
+    except QueueFull as e:
+        response = jsonify({'error': f"Generator busy, try again shortly ({e})"})
+        response.headers['Retry-After'] = '1'
+        return response, 429
+    
+    return jsonify({
+        'job_id': job.id,
+        'app_name': app_name,
+        'status': job.status,
+        # True if this request joined an identical generation already in flight
+        'shared': job.requests > 1,
+        'status_url': f"/jobs/{job.id}",
+    }), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Status of a generation job; 'result' is filled in once it finishes"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job.to_dict())
+
+SSE_HEARTBEAT_SECONDS = 15
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Stream a job's progress as Server-Sent Events.
+    
+    Every generation event (stage, file, done, ...) is sent as it happens,
+    named by its type, followed by a final 'result' event with the job
+    result. Reconnecting clients resume after Last-Event-ID.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    try:
+        since = int(request.headers.get('Last-Event-ID', -1)) + 1
+    except ValueError:
+        since = 0
+    
+    def stream():
+        sent = since
+        while True:
+            events = job.wait_events(sent, timeout=SSE_HEARTBEAT_SECONDS)
+            if not events:
+                if job.finished is not None and sent >= len(job.events):
+                    return
+                yield ": keepalive\n\n"
+                continue
+            for event in events:
+                yield f"id: {sent}\nevent: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                sent += 1
+    
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+class _ChunkPipe:
+    """Write-only stream handing fixed-size chunks to a reader thread.
+    
+    The writer blocks once `max_chunks` are queued, so memory stays bounded
+    by chunk_size * max_chunks no matter how big the archive gets.
+    """
+    
+    def __init__(self, chunk_size: int = 64 * 1024, max_chunks: int = 4):
+        self.chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._buffer = bytearray()
+        self._aborted = threading.Event()
+    
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.chunk_size:
+            self._put(bytes(self._buffer[:self.chunk_size]))
+            del self._buffer[:self.chunk_size]
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def close(self, error: Exception = None):
+        if self._buffer and not error:
+            self._put(bytes(self._buffer))
+        self._buffer.clear()
+        self._put(error)
+    
+    def abort(self):
+        """Reader went away - make the writer bail out instead of blocking"""
+        self._aborted.set()
+    
+    def _put(self, item):
+        while not self._aborted.is_set():
+            try:
+                self._queue.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+        raise BrokenPipeError('download client disconnected')
+    
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+ARCHIVE_FORMATS = {
+    'zip': (ZipSink, 'application/zip', 'zip'),
+    'tar.gz': (TarSink, 'application/gzip', 'tar.gz'),
+}
+
+@app.route('/download', methods=['GET', 'POST'])
+def download():
+    """Generate app from idea and stream it back as an archive (nothing hits disk)"""
+    data = request.get_json(silent=True) or {}
+    idea = data.get('idea') or request.args.get('idea', '')
+    fmt = data.get('format') or request.args.get('format', 'zip')
+    
+    if not idea:
+        return jsonify({'error': 'Idea is required'}), 400
+    if fmt not in ARCHIVE_FORMATS:
+        return jsonify({'error': f"Unsupported format, use one of: {', '.join(ARCHIVE_FORMATS)}"}), 400
+    
+    sink_class, mimetype, extension = ARCHIVE_FORMATS[fmt]
+    forge = CodeForge(quiet=True, listeners=[record_event])
+    app_name = forge.parse_idea(idea)['app_name'].lower()
+    pipe = _ChunkPipe()
+    
+    def produce():
+        error = None
+        try:
+            forge.generate(idea, sink=sink_class(pipe))
+        except Exception as e:
+            error = e
+        try:
+            pipe.close(error)
+        except BrokenPipeError:
+            pass
+    
+    threading.Thread(target=produce, daemon=True).start()
+    
+    def stream():
+        try:
+            yield from pipe
+        finally:
+            pipe.abort()
+    
+    return Response(
+        stream_with_context(stream()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{app_name}.{extension}"'},
+    )
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Runtime metrics in the Prometheus text format"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+APPS_DEFAULT_LIMIT = 50
+APPS_MAX_LIMIT = 500
 
 @app.route('/apps', methods=['GET'])
 def list_apps():
-    """List generated apps"""
-    generated_dir = Path('/Users/sravyalu/uniforge/generated')
-    
-    if not generated_dir.exists():
-        return jsonify({'apps': []})
-    
-    apps = []
-    for app_dir in generated_dir.iterdir():
-        if app_dir.is_dir() and (app_dir / 'frontend').exists():
-            apps.append({
-                'name': app_dir.name,
-                'path': str(app_dir),
-                'has_backend': (app_dir / 'backend').exists(),
-                'has_frontend': (app_dir / 'frontend').exists()
-            })
-    
-    return jsonify({'apps': apps})
+    """List generated apps from the catalog.
+    
+    Query: limit, cursor (next_cursor of the previous page), feature
+    (e.g. auth, upload) and sort (name, updated, created).
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', APPS_DEFAULT_LIMIT)), 1), APPS_MAX_LIMIT)
+        page = catalog.query(
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            feature=request.args.get('feature'),
+            sort=request.args.get('sort', 'name'),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    page['total'] = catalog.count(feature=request.args.get('feature'))
+    return jsonify(page)
 
 if __name__ == '__main__':
     print("🔥 CodeForge Web UI")
@@ -4,8 +4,7 @@ Demo script to showcase CodeForge capabilities
 Generates 5 example apps to demonstrate variety
 """
 
-import subprocess
-import sys
+from codeforge import CodeForge
 
 EXAMPLES = [
     "A simple todo list with categories and due dates",
@@ -19,20 +18,18 @@ def main():
     print("🔥 CodeForge Demo - Generating 5 Example Apps\n")
     print("=" * 70)
     
-    for i, idea in enumerate(EXAMPLES, 1):
-        print(f"\n📦 Example {i}/5: {idea}")
+    # One process pool for all examples instead of one interpreter per idea
+    results = CodeForge().generate_many(EXAMPLES)
+    
+    for i, result in enumerate(results, 1):
+        print(f"\n📦 Example {i}/5: {result['idea']}")
         print("-" * 70)
         
-        try:
-            subprocess.run(
-                [sys.executable, "codeforge.py", idea],
-                check=True
-            )
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Error generating app: {e}")
+        if result['error']:
+            print(f"❌ Error generating app: {result['error']}")
             continue
         
-        print("✅ Generated successfully!")
+        print(f"✅ Generated successfully: {result['app_name']} → {result['path']}")
     
     print("\n" + "=" * 70)
     print("🎉 Demo Complete!")
@@ -0,0 +1,194 @@
+"""watcher/journal.py: the RFC 6902 patch engine and crash recovery"""
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+WATCHER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'watcher')
+sys.path.insert(0, WATCHER)
+
+from journal import (JournaledDocument, PatchConflict, PatchError,  # noqa: E402
+                     apply_merge_patch, apply_patch, resolve)
+
+
+# ==================== RFC 6902 ====================
+
+@pytest.mark.parametrize('doc, ops, expected', [
+    # Appendix A examples
+    ({'foo': 'bar'}, [{'op': 'add', 'path': '/baz', 'value': 'qux'}], {'foo': 'bar', 'baz': 'qux'}),
+    ({'foo': ['bar', 'baz']}, [{'op': 'add', 'path': '/foo/1', 'value': 'qux'}],
+     {'foo': ['bar', 'qux', 'baz']}),
+    ({'baz': 'qux', 'foo': 'bar'}, [{'op': 'remove', 'path': '/baz'}], {'foo': 'bar'}),
+    ({'foo': ['bar', 'qux', 'baz']}, [{'op': 'remove', 'path': '/foo/1'}], {'foo': ['bar', 'baz']}),
+    ({'baz': 'qux', 'foo': 'bar'}, [{'op': 'replace', 'path': '/baz', 'value': 'boo'}],
+     {'baz': 'boo', 'foo': 'bar'}),
+    ({'foo': {'bar': 'baz', 'waldo': 'fred'}, 'qux': {'corge': 'grault'}},
+     [{'op': 'move', 'from': '/foo/waldo', 'path': '/qux/thud'}],
+     {'foo': {'bar': 'baz'}, 'qux': {'corge': 'grault', 'thud': 'fred'}}),
+    ({'foo': ['all', 'grass', 'cows', 'eat']}, [{'op': 'move', 'from': '/foo/1', 'path': '/foo/3'}],
+     {'foo': ['all', 'cows', 'eat', 'grass']}),
+    ({'foo': 'bar'}, [{'op': 'add', 'path': '/child', 'value': {'grandchild': {}}}],
+     {'foo': 'bar', 'child': {'grandchild': {}}}),
+    ({'foo': ['bar']}, [{'op': 'add', 'path': '/foo/-', 'value': ['abc', 'def']}],
+     {'foo': ['bar', ['abc', 'def']]}),
+    ({'foo': None}, [{'op': 'add', 'path': '/foo', 'value': 1}], {'foo': 1}),
+    ({'/': 9, '~1': 10}, [{'op': 'test', 'path': '/~01', 'value': 10}], {'/': 9, '~1': 10}),
+    # Escapes, whole-document and no-op cases
+    ({}, [{'op': 'add', 'path': '/a~1b', 'value': 1}, {'op': 'add', 'path': '/m~0n', 'value': 2}],
+     {'a/b': 1, 'm~n': 2}),
+    ({'': 1}, [{'op': 'replace', 'path': '/', 'value': 2}], {'': 2}),
+    ({'a': 1}, [{'op': 'replace', 'path': '', 'value': [1]}], [1]),
+    ({'a': 1}, [{'op': 'move', 'from': '/a', 'path': '/a'}], {'a': 1}),
+    ({'a': {'b': 1}}, [{'op': 'copy', 'from': '/a', 'path': '/c'}], {'a': {'b': 1}, 'c': {'b': 1}}),
+    ([1, 2], [{'op': 'add', 'path': '/2', 'value': 3}], [1, 2, 3]),
+    ({'a': [1, {'b': True}]}, [{'op': 'test', 'path': '/a', 'value': [1.0, {'b': True}]}],
+     {'a': [1, {'b': True}]}),
+])
+def test_patch(doc, ops, expected):
+    assert apply_patch(doc, ops) == expected
+
+
+@pytest.mark.parametrize('doc, ops', [
+    ({'foo': 'bar'}, [{'op': 'add', 'path': '/baz/bat', 'value': 'qux'}]),
+    ({'bar': [1, 2]}, [{'op': 'add', 'path': '/bar/8', 'value': 5}]),
+    ({'bar': [1, 2]}, [{'op': 'add', 'path': '/bar/01', 'value': 5}]),
+    ({'bar': [1, 2]}, [{'op': 'add', 'path': '/bar/-1', 'value': 5}]),
+    ({'bar': [1, 2]}, [{'op': 'remove', 'path': '/bar/2'}]),
+    ({'bar': [1, 2]}, [{'op': 'remove', 'path': '/bar/-'}]),
+    ({'a': 1}, [{'op': 'remove', 'path': '/b'}]),
+    ({'a': 1}, [{'op': 'replace', 'path': '/b', 'value': 2}]),
+    ({'a': 1}, [{'op': 'remove', 'path': ''}]),
+    ({'a': {'b': {}}}, [{'op': 'move', 'from': '/a', 'path': '/a/b/c'}]),
+    ({'a': 1}, [{'op': 'add', 'path': 'a', 'value': 2}]),
+    ({'a': 1}, [{'op': 'add', 'path': '/b'}]),
+    ({'a': 1}, [{'op': 'copy', 'path': '/b'}]),
+    ({'a': 1}, [{'op': 'frobnicate', 'path': '/a'}]),
+    ({'a': 'x'}, [{'op': 'add', 'path': '/a/b', 'value': 1}]),
+    ({'a': 1}, {'op': 'add', 'path': '/b', 'value': 2}),
+])
+def test_patch_errors(doc, ops):
+    with pytest.raises(PatchError):
+        apply_patch(doc, ops)
+
+
+@pytest.mark.parametrize('actual, value', [
+    (True, 1), (1, True), (False, 0), (0, False), ([True], [1]), ({'a': False}, {'a': 0}),
+    (1, '1'), (None, False), ({'a': 1}, {'a': 1, 'b': 2}), ([1, 2], [2, 1]),
+])
+def test_test_is_strict(actual, value):
+    with pytest.raises(PatchConflict):
+        apply_patch({'x': actual}, [{'op': 'test', 'path': '/x', 'value': value}])
+
+
+def test_patch_is_atomic_and_copies():
+    doc = {'a': {'b': [1, 2]}, 'c': {'d': 1}}
+    with pytest.raises(PatchError):
+        apply_patch(doc, [{'op': 'add', 'path': '/a/b/-', 'value': 3},
+                          {'op': 'remove', 'path': '/missing'}])
+    assert doc == {'a': {'b': [1, 2]}, 'c': {'d': 1}}
+
+    new = apply_patch(doc, [{'op': 'add', 'path': '/a/b/-', 'value': 3}])
+    assert doc['a']['b'] == [1, 2]
+    assert new['a']['b'] == [1, 2, 3]
+    assert new['c'] is doc['c']
+
+
+def test_resolve_and_merge_patch():
+    assert resolve({'a': [{'b': 1}]}, '/a/0/b') == 1
+    assert apply_merge_patch({'a': 'b', 'c': {'d': 'e', 'f': 'g'}}, {'a': 'z', 'c': {'f': None}}) == \
+        {'a': 'z', 'c': {'d': 'e'}}
+    assert apply_merge_patch({'a': 1}, ['x']) == ['x']
+
+
+# ==================== RECOVERY ====================
+
+def _open(path, **kwargs):
+    return JournaledDocument(str(path), [], **kwargs)
+
+
+def test_changes_survive_without_compaction(tmp_path):
+    path = tmp_path / 'data.json'
+    doc = _open(path)
+    doc.set({'items': [{'id': 1}]})
+    doc.patch([{'op': 'add', 'path': '/items/-', 'value': {'id': 2}}])
+    doc.merge_patch({'meta': {'count': 2}})
+    doc._journal.close()  # no compaction, as after a crash
+
+    reopened = _open(path)
+    assert reopened.get() == {'items': [{'id': 1}, {'id': 2}], 'meta': {'count': 2}}
+    reopened.close()
+
+
+def test_compaction_matches_on_reopen(tmp_path):
+    path = tmp_path / 'data.json'
+    doc = _open(path)
+    doc.set({'text': 'line one\nline two'})
+    assert doc.compact()
+    doc.patch([{'op': 'add', 'path': '/n', 'value': 1}])
+    doc._journal.close()
+
+    with open(f"{path}.journal", 'rb') as f:
+        assert b'\r\n' not in f.read()
+    reopened = _open(path)
+    assert reopened.get() == {'text': 'line one\nline two', 'n': 1}
+    assert not os.path.exists(f"{path}.journal.stale")
+    reopened.close()
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    path = tmp_path / 'data.json'
+    doc = _open(path)
+    doc.set([1])
+    doc._journal.write('{"patch":[{"op":"add","pa')
+    doc._journal.close()
+
+    reopened = _open(path)
+    assert reopened.get() == [1]
+    reopened.close()
+
+
+CRASH_SCRIPT = """
+import os, sys
+sys.path.insert(0, {watcher!r})
+import journal
+
+doc = journal.JournaledDocument({path!r}, [], compact_every=10 ** 6)
+doc.set([0])
+doc.compact()
+for i in range(1, 6):
+    doc.patch([{{'op': 'add', 'path': '/-', 'value': i}}])
+
+real_write = journal._atomic_write
+def crashing_write(path, text):
+    if path == doc.path and {when!r} == 'before':
+        os._exit(3)  # marker appended, snapshot not yet replaced
+    real_write(path, text)
+    os._exit(3)      # snapshot replaced, journal not yet trimmed
+journal._atomic_write = crashing_write
+doc.compact()
+"""
+
+
+@pytest.mark.parametrize('when', ['before', 'after'])
+def test_kill_mid_compaction(tmp_path, when):
+    path = str(tmp_path / 'data.json')
+    script = CRASH_SCRIPT.format(watcher=WATCHER, path=path, when=when)
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True)
+    assert result.returncode == 3, result.stderr
+
+    with open(f"{path}.journal", encoding='utf-8') as f:
+        assert any('"compact"' in line for line in f)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == ([0] if when == 'before' else [0, 1, 2, 3, 4, 5])
+
+    doc = _open(path)
+    assert doc.get() == [0, 1, 2, 3, 4, 5]
+    assert not os.path.exists(f"{path}.journal.stale")
+    doc.patch([{'op': 'add', 'path': '/-', 'value': 6}])
+    doc._journal.close()
+
+    again = _open(path)
+    assert again.get() == [0, 1, 2, 3, 4, 5, 6]
+    again.close()
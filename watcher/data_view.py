@@ -0,0 +1,77 @@
+# watcher/data_view.py
+# GET /data: ETag revalidation, offset/cursor pages, streamed bodies.
+# Works with any store that has snapshot() and iter_body() (journal.py, sqlite_store.py).
+import json
+import base64
+from flask import Response, request, jsonify
+
+from journal import iter_json
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+def encode_cursor(offset):
+    return base64.urlsafe_b64encode(json.dumps({'offset': offset}).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))['offset']
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError('Invalid cursor')
+    return offset
+
+def page_bounds(args):
+    """(offset, limit) for ?offset=&limit= or ?cursor=&limit=, None for the whole document"""
+    if not any(k in args for k in ('offset', 'limit', 'cursor')):
+        return None
+    offset = decode_cursor(args['cursor']) if args.get('cursor') else _int(args, 'offset', 0, 0)
+    return offset, min(_int(args, 'limit', DEFAULT_LIMIT, 1), MAX_LIMIT)
+
+def _int(args, name, default, minimum):
+    try:
+        value = int(args.get(name, default))
+    except ValueError:
+        value = None
+    if value is None or value < minimum:
+        raise ValueError(f'{name} must be an integer >= {minimum}')
+    return value
+
+def data_response(store):
+    """The document, or one page of it, with a strong ETag (304 on If-None-Match).
+
+    Pages carry X-Total-Count and, unless they're the last one, X-Next-Cursor
+    and a Link rel="next". Bodies are generated in chunks, so a large
+    document goes out with chunked encoding instead of being built as one
+    string per request.
+    """
+    value, etag = store.snapshot()
+    try:
+        bounds = page_bounds(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    headers = {'Cache-Control': 'no-cache'}
+    if bounds is None:
+        tag = etag
+        body = store.iter_body(value)
+    else:
+        if not isinstance(value, list):
+            return jsonify({'error': 'Pagination needs a list dataset'}), 400
+        offset, limit = bounds
+        end = offset + limit
+        tag = f"{etag}-{offset}-{limit}"
+        headers['X-Total-Count'] = str(len(value))
+        if end < len(value):
+            cursor = encode_cursor(end)
+            headers['X-Next-Cursor'] = cursor
+            headers['Link'] = f'<{request.path}?cursor={cursor}&limit={limit}>; rel="next"'
+        body = iter_json(value[offset:end])
+
+    if request.if_none_match.contains_weak(tag):
+        response = Response(status=304, headers=headers)
+    else:
+        response = Response(body, mimetype='application/json', headers=headers)
+    response.set_etag(tag)
+    return response
@@ -0,0 +1,85 @@
+# watcher/hotkeys.py
+import threading
+
+import keyboard
+
+from registry import hotkey_key
+
+
+class HotkeyBindings:
+    """Keyboard hotkeys for saved patterns, at most one handler per pattern.
+
+    Owns the handles returned by keyboard.add_hotkey: binding a pattern
+    again (re-save or rebind) removes its old handler first, and unbind()
+    removes it for good. A hotkey (compared case-insensitively) already
+    bound to another pattern is refused, so each trigger fires exactly
+    one replay.
+    `on_trigger(name, plan)` runs on the keyboard thread and should only
+    hand off (e.g. queue the replay).
+    """
+
+    def __init__(self, on_trigger, add=None, remove=None):
+        self.on_trigger = on_trigger
+        self._add = add or keyboard.add_hotkey
+        self._remove = remove or keyboard.remove_hotkey
+        self._lock = threading.Lock()
+        self._bindings = {}  # name -> (hotkey, handle)
+
+    def bind(self, name, hotkey, plan):
+        """(Re)bind a pattern; an empty hotkey just unbinds. Returns True if bound."""
+        with self._lock:
+            self._unbind(name)
+            if not hotkey:
+                return False
+            owner = self._owner(hotkey)
+            if owner is not None:
+                print(f"[Hotkey] {hotkey} is already bound to {owner}; not binding {name}")
+                return False
+            try:
+                handle = self._add(hotkey, lambda: self._trigger(name, hotkey, plan))
+            except Exception as e:
+                print(f"[Hotkey] Could not register {hotkey}: {e}")
+                return False
+            self._bindings[name] = (hotkey, handle)
+        print(f"[Hotkey] Registered {name} -> {hotkey}")
+        return True
+
+    def unbind(self, name):
+        """Remove a pattern's hotkey; returns True if one was bound"""
+        with self._lock:
+            return self._unbind(name)
+
+    def all(self):
+        with self._lock:
+            return [{'name': name, 'hotkey': hotkey} for name, (hotkey, _) in self._bindings.items()]
+
+    def __len__(self):
+        return len(self._bindings)
+
+    def _owner(self, hotkey):
+        # Called with self._lock held
+        key = hotkey_key(hotkey)
+        for name, (bound, _) in self._bindings.items():
+            if hotkey_key(bound) == key:
+                return name
+        return None
+
+    def _unbind(self, name):
+        # Called with self._lock held
+        binding = self._bindings.pop(name, None)
+        if binding is None:
+            return False
+        hotkey, handle = binding
+        try:
+            self._remove(handle)
+        except Exception as e:
+            print(f"[Hotkey] Could not unregister {hotkey}: {e}")
+        print(f"[Hotkey] Unregistered {name} -> {hotkey}")
+        return True
+
+    def _trigger(self, name, hotkey, plan):
+        print(f"[Hotkey] Trigger '{name}' via {hotkey}")
+        try:
+            self.on_trigger(name, plan)
+        except Exception as e:
+            print(f"[Hotkey] Replay error: {e}")
@@ -0,0 +1,410 @@
+# watcher/journal.py
+# JSON Patch (RFC 6902) / JSON Merge Patch (RFC 7396) and a journaled JSON document.
+# No sibling imports, so backend/main.py can use it too.
+import os
+import json
+import atexit
+import hashlib
+import threading
+
+
+class PatchError(ValueError):
+    """Malformed patch, or a path that doesn't exist"""
+
+
+class PatchConflict(PatchError):
+    """A 'test' operation failed"""
+
+
+# ==================== JSON POINTER / PATCH ====================
+# Patches never modify the document they're given: containers along the
+# changed path are copied, everything else is shared. Readers holding the
+# old document keep a consistent view.
+
+def parse_pointer(pointer):
+    if pointer == '':
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith('/'):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [t.replace('~1', '/').replace('~0', '~') for t in pointer[1:].split('/')]
+
+def _list_index(node, token, end_ok=False):
+    if end_ok and token == '-':
+        return len(node)
+    if not token.isdigit() or (token != '0' and token.startswith('0')):
+        raise PatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(node) or (index == len(node) and not end_ok):
+        raise PatchError(f"Array index out of range: {index}")
+    return index
+
+def _child(node, token):
+    if isinstance(node, dict):
+        if token not in node:
+            raise PatchError(f"No such member: {token!r}")
+        return node[token]
+    if isinstance(node, list):
+        return node[_list_index(node, token)]
+    raise PatchError(f"Cannot descend into {type(node).__name__} with {token!r}")
+
+def resolve(doc, pointer):
+    node = doc
+    for token in parse_pointer(pointer):
+        node = _child(node, token)
+    return node
+
+def _update(doc, tokens, change):
+    """Copy of doc where change(parent_copy, last_token) has been applied"""
+    node = doc.copy() if isinstance(doc, (dict, list)) else doc
+    if not isinstance(node, (dict, list)):
+        raise PatchError(f"Cannot change a member of {type(node).__name__}")
+    if len(tokens) == 1:
+        change(node, tokens[0])
+    else:
+        token = tokens[0]
+        key = _list_index(node, token) if isinstance(node, list) else token
+        node[key] = _update(_child(doc, token), tokens[1:], change)
+    return node
+
+def _add(doc, tokens, value):
+    if not tokens:
+        return value
+    def add(node, token):
+        if isinstance(node, list):
+            node.insert(_list_index(node, token, end_ok=True), value)
+        else:
+            node[token] = value
+    return _update(doc, tokens, add)
+
+def _remove(doc, tokens):
+    if not tokens:
+        raise PatchError("Cannot remove the whole document")
+    def remove(node, token):
+        if isinstance(node, list):
+            del node[_list_index(node, token)]
+        elif token in node:
+            del node[token]
+        else:
+            raise PatchError(f"No such member: {token!r}")
+    return _update(doc, tokens, remove)
+
+def _replace(doc, tokens, value):
+    if not tokens:
+        return value
+    def replace(node, token):
+        if isinstance(node, list):
+            node[_list_index(node, token)] = value
+        elif token in node:
+            node[token] = value
+        else:
+            raise PatchError(f"No such member: {token!r}")
+    return _update(doc, tokens, replace)
+
+def _json_equal(a, b):
+    """Equality as RFC 6902 'test' defines it: like ==, but true is not 1"""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b
+    return type(a) is type(b) and a == b
+
+def apply_patch(doc, ops):
+    """Apply an RFC 6902 operation list; all or nothing, returns the new document"""
+    if not isinstance(ops, list):
+        raise PatchError("A JSON Patch must be an array of operations")
+    for op in ops:
+        if not isinstance(op, dict) or 'op' not in op or 'path' not in op:
+            raise PatchError(f"Invalid operation: {op!r}")
+        kind = op['op']
+        tokens = parse_pointer(op['path'])
+        if kind in ('add', 'replace', 'test') and 'value' not in op:
+            raise PatchError(f"'{kind}' needs a value")
+        if kind in ('move', 'copy') and 'from' not in op:
+            raise PatchError(f"'{kind}' needs a from")
+
+        if kind == 'add':
+            doc = _add(doc, tokens, op['value'])
+        elif kind == 'remove':
+            doc = _remove(doc, tokens)
+        elif kind == 'replace':
+            doc = _replace(doc, tokens, op['value'])
+        elif kind == 'move':
+            source = parse_pointer(op['from'])
+            if tokens[:len(source)] == source and len(tokens) > len(source):
+                raise PatchError("Cannot move a value into itself")
+            value = resolve(doc, op['from'])
+            doc = _add(_remove(doc, source), tokens, value)
+        elif kind == 'copy':
+            doc = _add(doc, tokens, resolve(doc, op['from']))
+        elif kind == 'test':
+            if not _json_equal(resolve(doc, op['path']), op['value']):
+                raise PatchConflict(f"Test failed at {op['path']!r}")
+        else:
+            raise PatchError(f"Unknown operation: {kind!r}")
+    return doc
+
+def apply_merge_patch(target, patch):
+    """Apply an RFC 7396 merge patch, returns the new document"""
+    if not isinstance(patch, dict):
+        return patch
+    result = target.copy() if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+# ==================== STREAMING ====================
+
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+def iter_json(value, chunk_size=64 * 1024):
+    """Compact JSON as a stream of byte chunks of roughly chunk_size"""
+    buf, size = [], 0
+    for piece in _ENCODER.iterencode(value):
+        buf.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(buf).encode('utf-8')
+            buf, size = [], 0
+    if buf:
+        yield ''.join(buf).encode('utf-8')
+
+
+# ==================== JOURNALED DOCUMENT ====================
+
+class JournaledDocument:
+    """A JSON file kept in memory, with changes appended to a journal.
+
+    `path` holds the last snapshot (pretty-printed JSON, as before) and
+    `path`.journal one line per change since then: {"patch": [...]},
+    {"merge": {...}} or {"set": ...}. A change costs one appended line,
+    sized like the change rather than the document. Once the journal holds
+    `compact_every` changes or outgrows the snapshot, a background thread
+    writes a fresh snapshot and drops the lines it covers.
+
+    The journal starts with {"base": sha256 of the snapshot}. Compaction
+    first appends {"compact": sha256, "upto": n} and only then replaces the
+    snapshot, so after a crash at any point startup can tell which lines the
+    snapshot on disk already contains.
+
+    Values are shared with readers: treat get() results as read-only.
+    Every change bumps a version; with a per-process random prefix it makes
+    the ETag, so revalidating costs no serialization or hashing.
+    """
+
+    def __init__(self, path, default, compact_every=1000, min_compact_bytes=64 * 1024):
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        self.compact_every = compact_every
+        self.min_compact_bytes = min_compact_bytes
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._compacting = False
+        self._body = None
+        self._journal = None
+        self._epoch = os.urandom(4).hex()
+        self._version = 0
+        self._value = self._recover(default)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8', newline='')
+        atexit.register(self.close)
+
+    def get(self):
+        return self._value
+
+    def body(self):
+        """The value as compact JSON bytes, cached until the next change"""
+        body = self._body
+        if body is None:
+            value = self._value
+            body = json.dumps(value, separators=(',', ':')).encode('utf-8')
+            with self._lock:
+                if self._value is value:
+                    self._body = body
+        return body
+
+    def snapshot(self):
+        """(value, etag) as one consistent pair"""
+        with self._lock:
+            return self._value, f"{self._epoch}-{self._version}"
+
+    def iter_body(self, value):
+        """body() of a snapshot value, streamed in chunks if it isn't cached yet"""
+        body = self._body
+        if body is not None and self._value is value:
+            yield body
+            return
+        chunks = []
+        for chunk in iter_json(value):
+            chunks.append(chunk)
+            yield chunk
+        with self._lock:
+            if self._value is value:
+                self._body = b''.join(chunks)
+
+    def set(self, value):
+        with self._lock:
+            self._commit({'set': value}, value)
+
+    def patch(self, ops):
+        """Apply a JSON Patch (raises PatchError / PatchConflict, leaving the document as it was)"""
+        with self._lock:
+            self._commit({'patch': ops}, apply_patch(self._value, ops))
+
+    def merge_patch(self, patch):
+        with self._lock:
+            self._commit({'merge': patch}, apply_merge_patch(self._value, patch))
+
+    def flush(self):
+        return self.compact()
+
+    def _commit(self, entry, value):
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        self._journal.write(line)
+        self._journal.flush()
+        self._value = value
+        self._body = None
+        self._version += 1
+        self._ops += 1
+        self._journal_bytes += len(line)
+        if not self._compacting and (self._ops >= self.compact_every or
+                                     self._journal_bytes > max(self.min_compact_bytes, self._snapshot_bytes)):
+            self._compacting = True
+            threading.Thread(target=self.compact, name=f"compact:{os.path.basename(self.path)}",
+                             daemon=True).start()
+
+    def compact(self):
+        """Write a snapshot and trim the journal; returns False if saving failed"""
+        with self._compact_lock:
+            try:
+                with self._lock:
+                    value, upto = self._value, self._ops
+                if upto == 0:
+                    return True
+                text = json.dumps(value, indent=2)
+                digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+                with self._lock:
+                    self._journal.write(json.dumps({'compact': digest, 'upto': upto}) + '\n')
+                    self._journal.flush()
+                if not _atomic_write(self.path, text):
+                    return False
+                with self._lock:
+                    self._journal.close()
+                    entries = _read_journal(self.journal_path)[1]
+                    self._start_journal(digest, [line for _, line in entries[upto:]])
+                    self._journal = open(self.journal_path, 'a', encoding='utf-8', newline='')
+                    self._snapshot_bytes = len(text)
+                return True
+            finally:
+                self._compacting = False
+
+    def close(self):
+        if self._journal and not self._journal.closed:
+            self.compact()
+            self._journal.close()
+
+    def _start_journal(self, base, lines=()):
+        """Atomically replace the journal with a header and the given entry lines"""
+        text = json.dumps({'base': base}) + '\n' + ''.join(lines)
+        if not _atomic_write(self.journal_path, text):
+            raise OSError(f"Could not write {self.journal_path}")
+        self._ops = len(lines)
+        self._journal_bytes = len(text)
+
+    def _recover(self, default):
+        value, digest, self._snapshot_bytes = default, None, 0
+        try:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            value = json.loads(raw)
+            digest = hashlib.sha256(raw).hexdigest()
+            self._snapshot_bytes = len(raw)
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            print(f"[WARN] Failed to load {self.path}: {e}")
+
+        header, entries = _read_journal(self.journal_path)
+        start = None
+        if header is None and not entries:
+            start = 0
+        elif header is not None and header.get('base') == digest:
+            start = 0
+        else:
+            # Crashed mid-compaction: the snapshot covers the entries up to its marker
+            for marker in header.get('markers', []) if header else []:
+                if marker['compact'] == digest:
+                    start = marker['upto']
+        if start is None:
+            print(f"[WARN] {self.journal_path} doesn't match {self.path}; ignoring it")
+            os.replace(self.journal_path, f"{self.journal_path}.stale")
+            entries, start = [], 0
+
+        replayed = []
+        for entry, line in entries[start:]:
+            try:
+                value = _replay(value, entry)
+                replayed.append(line)
+            except PatchError as e:
+                print(f"[WARN] Skipping journal entry: {e}")
+
+        # Start from a clean journal (drops torn lines and old markers)
+        self._start_journal(digest, replayed)
+        return value
+
+
+def _replay(value, entry):
+    if 'patch' in entry:
+        return apply_patch(value, entry['patch'])
+    if 'merge' in entry:
+        return apply_merge_patch(value, entry['merge'])
+    if 'set' in entry:
+        return entry['set']
+    raise PatchError(f"Unknown journal entry: {entry!r}")
+
+def _read_journal(path):
+    """(header with its 'markers', [(entry, line), ...]); a torn last line is dropped"""
+    header, entries = None, []
+    try:
+        with open(path, encoding='utf-8', newline='') as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return None, []
+    for i, line in enumerate(lines):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            if i == len(lines) - 1:
+                break
+            raise
+        if 'base' in entry:
+            header = {'base': entry['base'], 'markers': []}
+        elif 'compact' in entry:
+            if header is None:
+                header = {'base': None, 'markers': []}
+            header['markers'].append(entry)
+        else:
+            entries.append((entry, line if line.endswith('\n') else line + '\n'))
+    return header, entries
+
+def _atomic_write(path, text):
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        # newline='' so the bytes on disk are the ones that were hashed
+        with open(tmp, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        os.replace(tmp, path)
+        return True
+    except Exception as e:
+        print(f"[WARN] Failed to save {path}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
@@ -0,0 +1,77 @@
+# watcher/pattern_codec.py
+# Compact patterns: key indexes and key-down gaps as varints, base64 in JSON.
+import base64
+
+FORMAT = 'kd1'
+
+
+def pack_ints(values):
+    """Non-negative ints as LEB128 varints, base64 encoded"""
+    out = bytearray()
+    for value in values:
+        value = int(value)
+        if value < 0:
+            raise ValueError(f"Cannot pack negative value {value}")
+        while value > 0x7f:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+        out.append(value)
+    return base64.b64encode(bytes(out)).decode('ascii')
+
+def unpack_ints(text):
+    values, value, shift = [], 0, 0
+    for byte in base64.b64decode(text):
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value, shift = 0, 0
+    if shift:
+        raise ValueError("Truncated varint data")
+    return values
+
+
+def pack_pattern(names, delays=None):
+    """{'format', 'keys', 'names', 'data'[, 'timed']} for a list of key names.
+
+    `names` is the table of distinct key names; `data` holds, per key
+    down, its index in the table and the milliseconds since the previous
+    key down (0 for untimed patterns). Typing-heavy recordings come out
+    several times smaller than a JSON list of names, and keep their timing.
+    """
+    table, index = [], {}
+    values = []
+    for i, name in enumerate(names):
+        if name not in index:
+            index[name] = len(table)
+            table.append(name)
+        values.append(index[name])
+        values.append(int(round(delays[i])) if delays else 0)
+    packed = {'format': FORMAT, 'keys': len(names), 'names': table, 'data': pack_ints(values)}
+    if delays:
+        packed['timed'] = True
+    return packed
+
+def unpack_pattern(packed):
+    """(names, delays in ms or None) from pack_pattern() output"""
+    if packed.get('format') != FORMAT:
+        raise ValueError(f"Unknown pattern format: {packed.get('format')!r}")
+    values = unpack_ints(packed['data'])
+    table = packed['names']
+    if len(values) % 2:
+        raise ValueError("Pattern data must hold (key, delay) pairs")
+    if not isinstance(table, list) or not all(isinstance(name, str) for name in table):
+        raise ValueError("Pattern names must be strings")
+    names = [table[i] for i in values[0::2]]
+    if packed.get('keys') != len(names):
+        raise ValueError(f"Pattern has {len(names)} keys, not {packed.get('keys')!r}")
+    return names, (values[1::2] if packed.get('timed') else None)
+
+def read_pattern(pattern):
+    """(names, delays or None) from a packed pattern or a plain list of key names"""
+    if isinstance(pattern, dict):
+        return unpack_pattern(pattern)
+    if isinstance(pattern, list) and all(isinstance(key, str) for key in pattern):
+        return pattern, None
+    raise ValueError("A pattern is a list of key names or a packed pattern")
@@ -0,0 +1,121 @@
+# watcher/record_sessions.py
+import time
+import uuid
+import threading
+from collections import OrderedDict
+
+import keyboard
+
+from pattern_codec import pack_pattern
+
+DEFAULT_DURATION = 3.0
+MAX_DURATION = 300.0
+
+
+class RecordSession:
+    """Keys captured between start and stop (or the deadline), with their timing"""
+
+    def __init__(self, duration):
+        self.id = uuid.uuid4().hex[:12]
+        self.duration = duration
+        self.started = time.time()
+        self.deadline = time.monotonic() + duration
+        self.stopped = None
+        self.pattern = []
+        self.delays = []  # ms since the previous key (or the start)
+        self._last = time.monotonic()
+
+    @property
+    def status(self):
+        return 'stopped' if self.stopped is not None else 'recording'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'pattern': list(self.pattern),
+            'packed': pack_pattern(self.pattern, self.delays),
+            'duration': self.duration,
+            'started': self.started,
+            'stopped': self.stopped,
+        }
+
+
+class RecordSessions:
+    """Any number of recordings sharing one keyboard hook.
+
+    The hook is installed when the first session starts and removed when
+    the last one stops; each key-down is appended to every active session.
+    A single reaper thread stops sessions at their deadline, so nothing
+    waits per session. The last `history` stopped sessions stay readable.
+    """
+
+    def __init__(self, history=100):
+        self.history = history
+        self._sessions = OrderedDict()
+        self._active = {}
+        self._hook = None
+        self._cond = threading.Condition()
+        threading.Thread(target=self._reap, name='record-reaper', daemon=True).start()
+
+    def start(self, duration=DEFAULT_DURATION):
+        """Start recording; raises (OSError, ImportError, ...) if the keyboard can't be hooked"""
+        session = RecordSession(max(1.0, min(MAX_DURATION, duration)))
+        with self._cond:
+            if self._hook is None:
+                self._hook = keyboard.hook(self._on_key)
+            self._sessions[session.id] = session
+            self._active[session.id] = session
+            self._cond.notify()
+        return session
+
+    def stop(self, session_id):
+        """Stop a session early; returns it, or None if unknown"""
+        with self._cond:
+            session = self._sessions.get(session_id)
+            if session is not None and session.stopped is None:
+                self._stop(session)
+        return session
+
+    def get(self, session_id):
+        return self._sessions.get(session_id)
+
+    def active(self):
+        return len(self._active)
+
+    def _on_key(self, event):
+        if event.event_type != keyboard.KEY_DOWN:
+            return
+        now = time.monotonic()
+        for session in list(self._active.values()):
+            if now < session.deadline:
+                session.delays.append((now - session._last) * 1000)
+                session._last = now
+                session.pattern.append(event.name)
+
+    def _stop(self, session):
+        # Called with self._cond held
+        session.stopped = time.time()
+        del self._active[session.id]
+        print(f"[Record] {session.id}: {len(session.pattern)} keys")
+        if not self._active and self._hook is not None:
+            try:
+                keyboard.unhook(self._hook)
+            except Exception as e:
+                print(f"[Record] Could not unhook keyboard: {e}")
+            self._hook = None
+        stopped = [s for s in self._sessions.values() if s.stopped is not None]
+        for old in stopped[:max(0, len(stopped) - self.history)]:
+            del self._sessions[old.id]
+
+    def _reap(self):
+        with self._cond:
+            while True:
+                if not self._active:
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                for session in [s for s in self._active.values() if s.deadline <= now]:
+                    self._stop(session)
+                if self._active:
+                    self._cond.wait(min(s.deadline for s in self._active.values()) - now)
@@ -0,0 +1,102 @@
+# watcher/registry.py
+import threading
+
+
+def hotkey_key(hotkey):
+    return (hotkey or '').strip().lower()
+
+
+class PatternRegistry:
+    """Saved patterns keyed by name, with a secondary index on hotkey.
+
+    Lookup, upsert and delete by name and lookup by hotkey are dict
+    operations; listing keeps insertion order (an upsert of an existing
+    name keeps its place). Entries are {'name', 'pattern', 'hotkey'} dicts
+    that are replaced, never mutated, so they can be handed out and saved
+    without copying. Every change is handed to the backing JsonStore.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._by_name = {}
+        self._by_hotkey = {}
+        for entry in store.get() or []:
+            if isinstance(entry, dict) and entry.get('name'):
+                self._put(entry)
+
+    def get(self, name):
+        return self._by_name.get(name)
+
+    def by_hotkey(self, hotkey):
+        """Patterns bound to a hotkey, oldest first"""
+        names = self._by_hotkey.get(hotkey_key(hotkey), ())
+        return [self._by_name[name] for name in names]
+
+    def all(self):
+        return list(self._by_name.values())
+
+    def body(self):
+        return self.store.body()
+
+    def upsert(self, name, pattern, hotkey=''):
+        """Add or replace a pattern; returns (entry, previous entry or None)"""
+        entry = {'name': name, 'pattern': pattern, 'hotkey': hotkey}
+        with self._lock:
+            previous = self._put(entry)
+            self._save()
+        return entry, previous
+
+    def set_hotkey(self, name, hotkey):
+        """Rebind a pattern; returns (entry, previous entry), or (None, None) if unknown"""
+        with self._lock:
+            previous = self._by_name.get(name)
+            if previous is None:
+                return None, None
+            entry = {**previous, 'hotkey': hotkey}
+            self._put(entry)
+            self._save()
+        return entry, previous
+
+    def delete(self, name):
+        """Remove a pattern; returns the removed entry or None"""
+        with self._lock:
+            entry = self._by_name.pop(name, None)
+            if entry is not None:
+                self._unindex(entry)
+                self._save()
+        return entry
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def _put(self, entry):
+        previous = self._by_name.get(entry['name'])
+        if previous is not None:
+            self._unindex(previous)
+        self._by_name[entry['name']] = entry
+        key = hotkey_key(entry.get('hotkey'))
+        if key:
+            # dict as an ordered set of names
+            self._by_hotkey.setdefault(key, {})[entry['name']] = None
+        return previous
+
+    def _unindex(self, entry):
+        key = hotkey_key(entry.get('hotkey'))
+        names = self._by_hotkey.get(key)
+        if names is not None:
+            names.pop(entry['name'], None)
+            if not names:
+                del self._by_hotkey[key]
+
+    def _save(self):
+        # O(1): the store builds the list when it next needs it (see JsonStore.set)
+        self.store.set(self._entries)
+
+    def _entries(self):
+        # Each call builds a new list, so the store can keep it as its value
+        with self._lock:
+            return list(self._by_name.values())
@@ -0,0 +1,142 @@
+# watcher/replay_plan.py
+# Patterns compiled to scan-code events once (at save time) instead of on every replay.
+import threading
+from collections import OrderedDict
+
+import keyboard
+
+from pattern_codec import read_pattern
+
+
+def _code(scan, down):
+    # One int per event: scan code and direction
+    return scan * 2 + (1 if down else 0)
+
+def compile_key(key):
+    """Press/release codes for one pattern entry ('a', 'ctrl+c', ...), same order as press_and_release"""
+    codes = []
+    for step in keyboard.parse_hotkey(key):
+        scans = [options[0] for options in step]
+        codes += [_code(scan, True) for scan in scans]
+        codes += [_code(scan, False) for scan in reversed(scans)]
+    return codes
+
+_shift_scans = None
+
+def _is_shift(scan):
+    global _shift_scans
+    if _shift_scans is None:
+        scans = set()
+        for name in ('shift', 'left shift', 'right shift'):
+            try:
+                scans.update(keyboard.key_to_scan_codes(name))
+            except Exception:
+                pass
+        _shift_scans = scans
+    return scan in _shift_scans
+
+def _is_shift_tap(stroke):
+    return not isinstance(stroke, str) and len(stroke) == 2 and stroke[0] == stroke[1] ^ 1 \
+        and stroke[0] & 1 and _is_shift(stroke[0] // 2)
+
+def _drop_noops(strokes, delays=None):
+    """Drop modifier events that do nothing.
+
+    'ctrl+c' then 'ctrl+v' needn't release ctrl just to press it again:
+    a release at the end of one stroke and the press starting the next
+    cancel out when that next stroke types a non-modifier key under it.
+    A lone 'shift' tap is dropped too, unless it's next to another one
+    (double shift is a shortcut). Taps of other modifiers are kept:
+    'windows' or 'alt' open a menu. Key names that couldn't be resolved
+    stay as strings and nothing cancels across them. The delay before a
+    dropped stroke moves to the next one kept. Returns (strokes, delays or None).
+    """
+    kept, kept_delays, pending = [], [], 0
+    for i, stroke in enumerate(strokes):
+        pending += delays[i] if delays else 0
+        if _is_shift_tap(stroke) and not any(
+                0 <= j < len(strokes) and _is_shift_tap(strokes[j]) for j in (i - 1, i + 1)):
+            continue
+        if not isinstance(stroke, str):
+            stroke = list(stroke)
+            prev = kept[-1] if kept else None
+            if isinstance(prev, list) and any(code & 1 and not keyboard.is_modifier(code // 2)
+                                              for code in stroke):
+                start = 0
+                while prev and start < len(stroke) and stroke[start] & 1 \
+                        and prev[-1] == stroke[start] ^ 1 and keyboard.is_modifier(stroke[start] // 2):
+                    prev.pop()
+                    start += 1
+                stroke = stroke[start:]
+        kept.append(stroke)
+        kept_delays.append(pending)
+        pending = 0
+    return kept, (kept_delays if delays else None)
+
+def compile_plan(pattern, delays=None):
+    """A replay plan: one stroke (list of codes) per pattern entry, no-ops removed.
+
+    With recorded `delays` (ms before each key) the plan keeps them per
+    stroke, for faithful or time-scaled replay.
+    """
+    strokes = []
+    for key in pattern:
+        try:
+            strokes.append(compile_key(key))
+        except Exception:
+            # Unknown to the keyboard layout (or no keyboard access): send by name
+            strokes.append(key)
+    strokes, delays = _drop_noops(strokes, delays)
+    return {'keys': len(pattern), 'strokes': strokes, 'delays': delays}
+
+class PlanCache:
+    """Compiled plans of saved patterns, kept in this process only.
+
+    Plans hold layout-specific scan codes and, for timed recordings, the
+    same gaps as the pattern, so they are not saved with it. Entries are
+    keyed by name and checked against the pattern, so a changed pattern
+    (or one edited by another process) is recompiled on its next use.
+    The `size` most recently used plans are kept.
+    """
+
+    def __init__(self, size=256):
+        self.size = size
+        self._plans = OrderedDict()  # name -> (pattern, plan)
+        self._lock = threading.Lock()
+
+    def get(self, entry):
+        """The plan for a saved pattern entry, compiled now if not cached"""
+        name, pattern = entry.get('name'), entry.get('pattern') or []
+        with self._lock:
+            cached = self._plans.get(name)
+            if cached is not None and cached[0] == pattern:
+                self._plans.move_to_end(name)
+                return cached[1]
+        plan = compile_plan(*read_pattern(pattern))
+        self.put(name, pattern, plan)
+        return plan
+
+    def put(self, name, pattern, plan):
+        with self._lock:
+            self._plans[name] = (pattern, plan)
+            self._plans.move_to_end(name)
+            while len(self._plans) > self.size:
+                self._plans.popitem(last=False)
+
+    def discard(self, name):
+        with self._lock:
+            self._plans.pop(name, None)
+
+def send_stroke(stroke, held):
+    """Send one stroke's events back to back; `held` tracks scan codes left pressed"""
+    if isinstance(stroke, str):
+        keyboard.press_and_release(stroke)
+        return
+    for code in stroke:
+        scan, down = divmod(code, 2)
+        if down:
+            keyboard.press(scan)
+            held.add(scan)
+        else:
+            keyboard.release(scan)
+            held.discard(scan)
@@ -0,0 +1,166 @@
+# watcher/replay_queue.py
+import time
+import uuid
+import threading
+from collections import OrderedDict, deque
+
+from replay_plan import send_stroke
+
+# Job states: queued -> running -> done | cancelled | failed
+QUEUED, RUNNING, DONE, CANCELLED, FAILED = 'queued', 'running', 'done', 'cancelled', 'failed'
+
+DEFAULT_INTERVAL = 0.02  # seconds between strokes (the old fixed 20 ms); 0 = max speed
+MAX_INTERVAL = 1.0
+MIN_SPEED, MAX_SPEED = 0.1, 100.0  # range for scaling recorded gaps
+MAX_GAP = 5.0  # longest wait between strokes of a timed replay, after scaling
+
+
+class QueueFull(Exception):
+    """Raised by ReplayQueue.submit when max_queued jobs are already waiting"""
+
+
+class ReplayJob:
+    """One compiled pattern (see replay_plan.py) to type, and how far it got"""
+
+    def __init__(self, plan, interval=DEFAULT_INTERVAL, name=None, scale=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.strokes = plan['strokes']
+        self.keys = plan['keys']
+        self.interval = interval
+        # Recorded gaps divided by `scale` replace the fixed interval when both exist
+        self.scale = scale if scale and plan.get('delays') else None
+        self.delays = plan.get('delays') if self.scale else None
+        self.name = name
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.sent = 0
+        self.error = None
+        self._cancel = threading.Event()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'keys': self.keys,
+            'strokes': len(self.strokes),
+            'sent': self.sent,
+            'interval_ms': None if self.scale else round(self.interval * 1000, 3),
+            'scale': self.scale,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'error': self.error,
+        }
+
+
+class ReplayQueue:
+    """A single worker thread that types patterns strictly in submission order.
+
+    Requests and hotkey callbacks only enqueue a job and return, so a long
+    macro never holds a server thread, and two replays never interleave
+    their keystrokes. Each stroke's events go out back to back, with
+    `interval` (or the recorded gap) between strokes. Cancelling a queued job drops it;
+    cancelling the running one stops it before its next stroke, releasing
+    anything still held. The last `history` finished jobs stay available
+    for status lookups.
+    """
+
+    def __init__(self, send=None, max_queued=100, history=200):
+        self._send = send or send_stroke
+        self.max_queued = max_queued
+        self.history = history
+        self._queue = deque()
+        self._jobs = OrderedDict()
+        self._current = None
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, name='replay', daemon=True).start()
+
+    def submit(self, plan, interval=DEFAULT_INTERVAL, name=None, scale=None):
+        """Queue a compiled plan and return its job (raises QueueFull).
+
+        With `scale` and a timed plan, strokes keep their recorded spacing
+        divided by scale (1 = as recorded, 4 = four times faster), each
+        gap capped at MAX_GAP so one job can't hold up the queue.
+        """
+        job = ReplayJob(plan, interval, name, scale)
+        with self._cond:
+            if len(self._queue) >= self.max_queued:
+                raise QueueFull(f"{self.max_queued} replays already queued")
+            self._queue.append(job)
+            self._jobs[job.id] = job
+            self._cond.notify()
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns it, or None if unknown"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished is not None:
+                return job
+            job._cancel.set()
+            if job.status == QUEUED:
+                self._queue.remove(job)
+                self._finish(job, CANCELLED)
+        return job
+
+    def stats(self):
+        with self._cond:
+            return {
+                'queued': len(self._queue),
+                'running': self._current.id if self._current else None,
+                'tracked': len(self._jobs),
+            }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                job = self._current = self._queue.popleft()
+                job.status = RUNNING
+                job.started = time.time()
+            print(f"[Replay] {job.id}: {job.keys} keys in {len(job.strokes)} strokes"
+                  f"{' (' + job.name + ')' if job.name else ''}")
+            status = DONE
+            held = set()
+            try:
+                for i, stroke in enumerate(job.strokes):
+                    if job._cancel.is_set():
+                        break
+                    wait = min(MAX_GAP, job.delays[i] / 1000 / job.scale) if job.delays else job.interval
+                    if i and wait and job._cancel.wait(wait):
+                        break
+                    try:
+                        self._send(stroke, held)
+                    except Exception as e:
+                        print(f"[Replay] Error replaying {stroke}: {e}")
+                    job.sent += 1
+                if job._cancel.is_set():
+                    status = CANCELLED
+            except Exception as e:
+                job.error = str(e)
+                status = FAILED
+            if held:
+                # Cancelled while a modifier was held across strokes
+                try:
+                    self._send([scan * 2 for scan in held], set())
+                except Exception as e:
+                    print(f"[Replay] Could not release {held}: {e}")
+            with self._cond:
+                self._current = None
+                self._finish(job, status)
+
+    def _finish(self, job, status):
+        # Called with self._cond held
+        job.status = status
+        job.finished = time.time()
+        # Forget the oldest finished jobs beyond `history`
+        finished = [j for j in self._jobs.values() if j.finished is not None]
+        for old in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[old.id]
@@ -1,10 +1,18 @@
 import time
+import math
 import threading
 import os
-import json
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import keyboard  # For capturing/replaying keys
+
+from storage import open_storage
+from journal import PatchError, PatchConflict
+from data_view import data_response
+from replay_queue import ReplayQueue, QueueFull, DEFAULT_INTERVAL, MAX_INTERVAL, MIN_SPEED, MAX_SPEED
+from record_sessions import RecordSessions, DEFAULT_DURATION
+from replay_plan import compile_plan, PlanCache
+from pattern_codec import pack_pattern, read_pattern
+from hotkeys import HotkeyBindings
 
 app = Flask(__name__)
 CORS(app)
@@ -12,30 +20,25 @@ CORS(app)
 DATA_FILE = "data.json"
 PATTERNS_FILE = "patterns.json"
 
-def load_json(path, default):
-    try:
-        if os.path.exists(path):
-            with open(path, 'r') as f:
-                return json.load(f)
-    except Exception as e:
-        print(f"[WARN] Failed to load {path}: {e}")
-    return default
+# WATCHER_STORAGE=json (default) or sqlite, see storage.py
+data_store, patterns = open_storage(DATA_FILE, PATTERNS_FILE)
 
-def save_json(path, data):
-    try:
-        with open(path, 'w') as f:
-            json.dump(data, f, indent=2)
-        return True
-    except Exception as e:
-        print(f"[WARN] Failed to save {path}: {e}")
-        return False
+# One ordered worker types every replay (requests and hotkeys just enqueue)
+replayer = ReplayQueue()
+# Recordings share one keyboard hook, see record_sessions.py
+recordings = RecordSessions()
+# Compiled replay plans of saved patterns (not persisted)
+plans = PlanCache()
+
+def json_body(store):
+    return app.response_class(store.body(), mimetype='application/json')
 
 # ==================== DATA ENDPOINTS ====================
 @app.route('/data')
 def get_data():
+    # ?offset=&limit= or ?cursor= for one page; ETag / If-None-Match for cheap polling
     try:
-        data = load_json(DATA_FILE, [])
-        return jsonify(data), 200
+        return data_response(data_store)
     except Exception as e:
         return jsonify({'error': f'Failed to load data: {str(e)}'}), 500
 
@@ -44,180 +47,250 @@ def save_data():
     try:
         if not request.json:
             return jsonify({'error': 'No data provided'}), 400
-        ok = save_json(DATA_FILE, request.json)
-        if ok:
-            return jsonify({'status': 'saved'}), 200
-        else:
-            return jsonify({'error': 'Failed to save data'}), 500
+        data_store.set(request.json)
+        return jsonify({'status': 'saved'}), 200
     except Exception as e:
         return jsonify({'error': f'Save failed: {str(e)}'}), 500
 
-# ==================== PATTERNS (Server storage) ====================
-def load_patterns():
-    return load_json(PATTERNS_FILE, [])
+@app.route('/data', methods=['PATCH'])
+def patch_data():
+    # application/json-patch+json (RFC 6902) or application/merge-patch+json (RFC 7396)
+    body = request.get_json(force=True, silent=True)
+    if body is None:
+        return jsonify({'error': 'No patch provided'}), 400
+    try:
+        if request.mimetype == 'application/merge-patch+json' or not isinstance(body, list):
+            data_store.merge_patch(body)
+        else:
+            data_store.patch(body)
+        return jsonify({'status': 'patched'}), 200
+    except PatchConflict as e:
+        return jsonify({'error': str(e)}), 409
+    except PatchError as e:
+        return jsonify({'error': str(e)}), 422
+    except Exception as e:
+        return jsonify({'error': f'Patch failed: {str(e)}'}), 500
 
-def save_patterns(patterns):
-    return save_json(PATTERNS_FILE, patterns)
+# ==================== PATTERNS (Server storage) ====================
 
-def register_hotkey_safely(name, hotkey, pattern):
+def trigger_replay(name, plan):
     try:
-        if not hotkey:
-            return False
-        def _cb():
-            print(f"[Hotkey] Trigger '{name}' via {hotkey}")
-            try:
-                for key in pattern:
-                    keyboard.press_and_release(key)
-                    time.sleep(0.02)
-            except Exception as e:
-                print(f"[Hotkey] Replay error: {e}")
-        keyboard.add_hotkey(hotkey, _cb)
-        print(f"[Hotkey] Registered {name} -> {hotkey}")
-        return True
-    except Exception as e:
-        print(f"[Hotkey] Could not register {hotkey}: {e}")
-        return False
+        replayer.submit(plan, name=name, scale=1.0)
+    except QueueFull as e:
+        print(f"[Hotkey] Replay dropped: {e}")
+
+# One keyboard handler per pattern with a hotkey, see hotkeys.py
+hotkeys = HotkeyBindings(trigger_replay)
+
+def hotkey_conflict(name, hotkey):
+    # One pattern per hotkey (case-insensitive), or one keypress would queue several replays
+    others = [p['name'] for p in patterns.by_hotkey(hotkey) if p['name'] != name] if hotkey else []
+    if others:
+        return jsonify({'error': f"Hotkey {hotkey} is already used by {others[0]}", 'pattern': others[0]}), 409
+    return None
 
 @app.route('/patterns', methods=['GET'])
 def patterns_get():
-    return jsonify(load_patterns())
+    return json_body(patterns)
 
 @app.route('/patterns', methods=['POST'])
 def patterns_post():
     body = request.get_json(force=True) or {}
     name = (body.get('name') or '').strip()
-    pattern = body.get('pattern') or []
     hotkey = (body.get('hotkey') or '').strip()
-    if not name or not isinstance(pattern, list):
+    try:
+        # A list of key names, or a packed (timed) recording
+        keys, delays = read_pattern(body.get('pattern') or [])
+    except (ValueError, KeyError, IndexError, TypeError):
+        keys = None
+    if not name or keys is None:
         return jsonify({'error': 'Invalid name or pattern'}), 400
-    patterns = load_patterns()
-    # upsert by name
-    found = False
-    for p in patterns:
-        if p.get('name') == name:
-            p['pattern'] = pattern
-            p['hotkey'] = hotkey
-            found = True
-            break
-    if not found:
-        patterns.append({'name': name, 'pattern': pattern, 'hotkey': hotkey})
-    save_patterns(patterns)
-    # Try hotkey registration (optional)
-    if hotkey:
-        register_hotkey_safely(name, hotkey, pattern)
-    return jsonify({'status': 'ok', 'patterns': patterns})
+    conflict = hotkey_conflict(name, hotkey)
+    if conflict:
+        return conflict
+    # Stored packed, and compiled once here; replays reuse the cached plan
+    packed = pack_pattern(keys, delays)
+    plan = compile_plan(keys, delays)
+    _, previous = patterns.upsert(name, packed, hotkey)
+    plans.put(name, packed, plan)
+    # Replace (or drop) the pattern's hotkey handler; registration is optional
+    if hotkey or (previous and previous.get('hotkey')):
+        hotkeys.bind(name, hotkey, plan)
+    return jsonify({'status': 'ok', 'patterns': patterns.all()})
 
 @app.route('/patterns/<name>', methods=['DELETE'])
 def patterns_delete(name):
     name = (name or '').strip()
-    patterns = load_patterns()
-    newp = [p for p in patterns if p.get('name') != name]
-    save_patterns(newp)
-    return jsonify({'status': 'ok', 'patterns': newp})
+    if patterns.delete(name) is not None:
+        hotkeys.unbind(name)
+        plans.discard(name)
+    return jsonify({'status': 'ok', 'patterns': patterns.all()})
 
 # ==================== RECORDER ENDPOINTS ====================
+def hook_error(e):
+    error = str(e)
+    if "administrator" in error.lower() or "permission" in error.lower():
+        error = "Accessibility permissions required. On macOS: System Settings → Privacy & Security → Accessibility → Add Terminal/Python"
+    return error
+
+def record_duration(body):
+    # Duration from query param or request body, default to 3 seconds
+    duration = request.args.get('duration', type=float)
+    if duration is None:
+        duration = body.get('duration', DEFAULT_DURATION)
+    return float(duration)
+
+@app.route('/record/start', methods=['POST'])
+def record_start():
+    body = request.get_json(force=True, silent=True) or {}
+    try:
+        duration = record_duration(body)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'duration must be a number'}), 400
+    try:
+        session = recordings.start(duration)
+    except Exception as e:
+        # OSError, or e.g. ImportError from the keyboard library when not root on Linux
+        return jsonify({
+            'error': 'Could not hook the keyboard',
+            'pattern': [],
+            'warning': hook_error(e),
+            'help': 'Run: sudo python run.py OR grant accessibility permissions'
+        }), 503
+    return jsonify({**session.to_dict(), 'session_id': session.id, 'status_url': f'/record/{session.id}'}), 201
+
+@app.route('/record/<session_id>/stop', methods=['POST'])
+def record_stop(session_id):
+    session = recordings.stop(session_id)
+    if session is None:
+        return jsonify({'error': 'Recording not found'}), 404
+    return jsonify(session.to_dict())
+
+@app.route('/record/<session_id>', methods=['GET'])
+def record_status(session_id):
+    session = recordings.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Recording not found'}), 404
+    return jsonify(session.to_dict())
+
 @app.route('/record', methods=['POST'])
 def record():
+    # Blocking form kept for older clients: a session that this request waits out
     try:
-        # Get duration from query param or request body, default to 3 seconds
-        duration = request.args.get('duration', type=float)
-        if duration is None:
-            body = request.get_json(force=True, silent=True) or {}
-            duration = body.get('duration', 3.0)
-        
-        # Validate duration (1-30 seconds)
-        duration = max(1.0, min(30.0, duration))
-        
-        pattern = []
-        recording_error = None
-        
-        def on_key(event):
-            # Capture key name (e.g., 'ctrl', 'c', 'enter')
-            if event.event_type == keyboard.KEY_DOWN:
-                pattern.append(event.name)
-        
-        # Try to hook keyboard events
+        body = request.get_json(force=True, silent=True) or {}
+        duration = max(1.0, min(30.0, record_duration(body)))
         try:
-            hook = keyboard.hook(on_key)
-            time.sleep(duration)
-            keyboard.unhook(hook)  # Clean up
+            session = recordings.start(duration)
         except OSError as e:
-            recording_error = str(e)
-            if "administrator" in str(e).lower() or "permission" in str(e).lower():
-                recording_error = "Accessibility permissions required. On macOS: System Settings → Privacy & Security → Accessibility → Add Terminal/Python"
-        
-        print(f"Recorded pattern ({duration}s): {pattern}")  # Console output for debugging
-        
-        if not pattern and recording_error:
             return jsonify({
-                'pattern': [], 
+                'pattern': [],
                 'duration': duration,
-                'warning': recording_error,
+                'warning': hook_error(e),
                 'help': 'Run: sudo python run.py OR grant accessibility permissions'
             }), 200
-        
-        return jsonify({'pattern': pattern, 'duration': duration}), 200
+        time.sleep(duration)
+        recordings.stop(session.id)
+        print(f"Recorded pattern ({duration}s): {session.pattern}")  # Console output for debugging
+        return jsonify({'pattern': session.pattern, 'packed': session.to_dict()['packed'], 'duration': duration}), 200
     except Exception as e:
         return jsonify({'error': f'Recording failed: {str(e)}'}), 500
 
+def replay_timing(body):
+    """(interval, scale) for a replay, from the query or body.
+
+    Recorded patterns replay with their own timing by default; speed=4
+    plays them four times faster (clamped to 0.1-100). interval_ms sets a
+    fixed gap between strokes instead (default 20 ms for untimed patterns),
+    and speed=max (or interval_ms=0) sends every stroke back to back.
+    """
+    speed = request.args.get('speed') or body.get('speed')
+    if speed == 'max':
+        return 0.0, None
+    value = request.args.get('interval_ms')
+    if value is None:
+        value = body.get('interval_ms')
+    if value is not None:
+        value = float(value)
+        if not math.isfinite(value):
+            raise ValueError('interval_ms must be finite')
+        return max(0.0, min(MAX_INTERVAL, value / 1000)), None
+    scale = float(speed) if speed is not None else 1.0
+    if not math.isfinite(scale) or scale <= 0:
+        raise ValueError('speed must be positive')
+    return DEFAULT_INTERVAL, max(MIN_SPEED, min(MAX_SPEED, scale))
+
+def submit_replay(plan, body, name=None):
+    if not plan['keys']:
+        return jsonify({'error': 'No pattern provided'}), 400
+    try:
+        interval, scale = replay_timing(body)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'interval_ms must be a number and speed a positive number or max'}), 400
+    try:
+        job = replayer.submit(plan, interval, name, scale)
+    except QueueFull as e:
+        return jsonify({'error': str(e)}), 429
+    return jsonify({'status': job.status, 'job_id': job.id, 'status_url': f'/replay/{job.id}'}), 202
+
 @app.route('/replay', methods=['POST'])
 def replay():
     try:
-        data = request.get_json()
+        data = request.get_json(force=True, silent=True)
         if not data:
             return jsonify({'error': 'No data provided'}), 400
-        pattern = data.get('pattern', [])
-        if not pattern:
-            return jsonify({'error': 'No pattern provided'}), 400
-        
-        print(f"Replaying pattern: {pattern}")  # Console output
-        for key in pattern:
-            try:
-                keyboard.press_and_release(key)
-                time.sleep(0.02)  # 20ms delay for natural feel
-            except Exception as e:
-                print(f"Error replaying {key}: {e}")
-        
-        return jsonify({'status': 'replayed'}), 200
+        try:
+            keys, delays = read_pattern(data.get('pattern') or [])
+        except (ValueError, KeyError, IndexError, TypeError):
+            return jsonify({'error': 'Invalid pattern'}), 400
+        return submit_replay(compile_plan(keys, delays), data)
     except Exception as e:
         return jsonify({'error': f'Replay failed: {str(e)}'}), 500
 
 @app.route('/replay/name/<name>', methods=['POST', 'GET'])
 def replay_by_name(name):
     try:
-        patterns = load_patterns()
-        for p in patterns:
-            if p.get('name') == name:
-                return replay_pattern(p.get('pattern', []))
-        return jsonify({'error': 'Pattern not found'}), 404
+        p = patterns.get(name)
+        if p is None:
+            return jsonify({'error': 'Pattern not found'}), 404
+        body = request.get_json(force=True, silent=True) or {}
+        return submit_replay(plans.get(p), body, name)
     except Exception as e:
         return jsonify({'error': f'Replay by name failed: {str(e)}'}), 500
 
-def replay_pattern(pattern):
-    if not pattern:
-        return jsonify({'error': 'No pattern provided'}), 400
-    print(f"Replaying pattern: {pattern}")
-    for key in pattern:
-        try:
-            keyboard.press_and_release(key)
-            time.sleep(0.02)
-        except Exception as e:
-            print(f"Error replaying {key}: {e}")
-    return jsonify({'status': 'replayed'})
+@app.route('/replay/<job_id>', methods=['GET'])
+def replay_status(job_id):
+    job = replayer.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Replay not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/replay/<job_id>', methods=['DELETE'])
+def replay_cancel(job_id):
+    job = replayer.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Replay not found'}), 404
+    return jsonify(job.to_dict())
 
 @app.route('/hotkey/register', methods=['POST'])
 def hotkey_register():
     body = request.get_json(force=True) or {}
     name = (body.get('name') or '').strip()
     hotkey = (body.get('hotkey') or '').strip()
-    patterns = load_patterns()
-    for p in patterns:
-        if p.get('name') == name:
-            p['hotkey'] = hotkey
-            save_patterns(patterns)
-            ok = register_hotkey_safely(name, hotkey, p.get('pattern', []))
-            return jsonify({'status': 'ok' if ok else 'warn', 'patterns': patterns})
-    return jsonify({'error': 'Pattern not found'}), 404
+    if name not in patterns:
+        return jsonify({'error': 'Pattern not found'}), 404
+    conflict = hotkey_conflict(name, hotkey)
+    if conflict:
+        return conflict
+    p, _ = patterns.set_hotkey(name, hotkey)
+    if p is None:
+        return jsonify({'error': 'Pattern not found'}), 404
+    ok = hotkeys.bind(name, hotkey, plans.get(p))
+    # An empty hotkey just clears the binding
+    return jsonify({'status': 'ok' if ok or not hotkey else 'warn', 'patterns': patterns.all()})
+
+@app.route('/hotkeys', methods=['GET'])
+def hotkeys_get():
+    return jsonify({'hotkeys': hotkeys.all(), 'count': len(hotkeys)})
 
 @app.route('/health')
 def health():
@@ -226,13 +299,14 @@ def health():
 if __name__ == '__main__':
     port = int(os.getenv('FLASK_PORT', 5001))
     print(f"Starting UniForge Server on http://127.0.0.1:{port}")
-    print(f"  - Data: /data, /save")
+    print(f"  - Data: GET/PATCH /data, POST /save")
     print(f"  - Patterns: GET/POST /patterns, DELETE /patterns/<name>")
-    print(f"  - Replay: POST /replay, GET/POST /replay/name/<name>")
-    print(f"  - Hotkeys: POST /hotkey/register (optional)")
+    print(f"  - Record: POST /record/start, POST /record/<id>/stop, GET /record/<id>")
+    print(f"  - Replay: POST /replay, GET/POST /replay/name/<name>, GET/DELETE /replay/<id>")
+    print(f"  - Hotkeys: GET /hotkeys, POST /hotkey/register (optional)")
     print(f"  - Health: /health")
     # Try to preload hotkeys
-    for item in load_patterns():
+    for item in patterns.all():
         if item.get('hotkey'):
-            register_hotkey_safely(item.get('name'), item.get('hotkey'), item.get('pattern', []))
+            hotkeys.bind(item.get('name'), item.get('hotkey'), plans.get(item))
     app.run(host='127.0.0.1', port=port, debug=False)
@@ -0,0 +1,247 @@
+# watcher/sqlite_store.py
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+
+from registry import hotkey_key
+from journal import apply_patch, apply_merge_patch
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS patterns (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    pattern TEXT NOT NULL,
+    hotkey TEXT NOT NULL DEFAULT '',
+    hotkey_key TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS patterns_hotkey ON patterns (hotkey_key, seq);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SqliteDB:
+    """One SQLite file in WAL mode: readers never block the writer or each other.
+
+    Each thread gets its own connection. write() runs a function inside
+    BEGIN IMMEDIATE, so read-modify-write cycles are serialized across
+    threads and processes instead of losing updates.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self.conn.executescript(SCHEMA)
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; transactions are explicit in write()
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def read(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchall()
+
+    def write(self, fn):
+        conn = self.conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return result
+
+
+class SqliteBlob:
+    """A JSON value stored in one row (same interface as JournaledDocument).
+
+    Each write also stores a random ETag in meta, in the same transaction.
+    """
+
+    def __init__(self, db, key, default):
+        self.db = db
+        self.key = key
+        self.default = default
+        self._parsed = (None, None, None)  # (etag, value, body) of the last snapshot
+
+    def get(self):
+        return json.loads(self.body())
+
+    def body(self):
+        rows = self.db.read("SELECT value FROM blobs WHERE key = ?", (self.key,))
+        return rows[0][0].encode('utf-8') if rows else json.dumps(self.default).encode('utf-8')
+
+    def snapshot(self):
+        """(value, etag); the value is only parsed again after a change"""
+        rows = self.db.read(
+            "SELECT b.value, m.value FROM blobs b LEFT JOIN meta m ON m.key = 'etag:' || b.key "
+            "WHERE b.key = ?", (self.key,))
+        if not rows:
+            return self.default, 'empty'
+        text, etag = rows[0]
+        if etag is None:
+            # Imported by migrate_json, never written since
+            etag = hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+        cached_etag, value, _ = self._parsed
+        if cached_etag != etag:
+            value = json.loads(text)
+            self._parsed = (etag, value, text.encode('utf-8'))
+        return value, etag
+
+    def iter_body(self, value):
+        _, cached, body = self._parsed
+        yield body if cached is value else json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+    def set(self, value):
+        self.db.write(lambda conn: self._put(conn, value))
+
+    def patch(self, ops):
+        """Apply a JSON Patch in one transaction (PatchError leaves the row as it was)"""
+        self.db.write(lambda conn: self._put(conn, apply_patch(self._load(conn), ops)))
+
+    def merge_patch(self, patch):
+        self.db.write(lambda conn: self._put(conn, apply_merge_patch(self._load(conn), patch)))
+
+    def _load(self, conn):
+        row = conn.execute("SELECT value FROM blobs WHERE key = ?", (self.key,)).fetchone()
+        return json.loads(row[0]) if row else self.default
+
+    def _put(self, conn, value):
+        conn.execute("INSERT INTO blobs (key, value) VALUES (?, ?) "
+                     "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                     (self.key, json.dumps(value, separators=(',', ':'))))
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                     (f"etag:{self.key}", os.urandom(8).hex()))
+
+    def flush(self):
+        return True
+
+
+COLUMNS = "name, pattern, hotkey"
+
+def _entry(row):
+    return {'name': row[0], 'pattern': json.loads(row[1]), 'hotkey': row[2]}
+
+
+UPSERT = ("INSERT INTO patterns (name, pattern, hotkey, hotkey_key) VALUES (?, ?, ?, ?) "
+          "ON CONFLICT (name) DO UPDATE SET pattern = excluded.pattern, hotkey = excluded.hotkey, "
+          "hotkey_key = excluded.hotkey_key")
+
+
+class SqlitePatterns:
+    """Patterns as rows (same interface as PatternRegistry).
+
+    Upserts touch one row and keep its position; listing is ordered by
+    first insertion.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def get(self, name):
+        rows = self.db.read(f"SELECT {COLUMNS} FROM patterns WHERE name = ?", (name,))
+        return _entry(rows[0]) if rows else None
+
+    def by_hotkey(self, hotkey):
+        key = hotkey_key(hotkey)
+        if not key:
+            return []
+        rows = self.db.read(f"SELECT {COLUMNS} FROM patterns WHERE hotkey_key = ? ORDER BY seq", (key,))
+        return [_entry(row) for row in rows]
+
+    def all(self):
+        return [_entry(row) for row in self.db.read(f"SELECT {COLUMNS} FROM patterns ORDER BY seq")]
+
+    def body(self):
+        return json.dumps(self.all(), separators=(',', ':')).encode('utf-8')
+
+    def upsert(self, name, pattern, hotkey=''):
+        entry = {'name': name, 'pattern': pattern, 'hotkey': hotkey}
+
+        def upsert(conn):
+            previous = conn.execute(f"SELECT {COLUMNS} FROM patterns WHERE name = ?", (name,)).fetchone()
+            conn.execute(UPSERT, (name, json.dumps(pattern), hotkey, hotkey_key(hotkey)))
+            return _entry(previous) if previous else None
+
+        return entry, self.db.write(upsert)
+
+    def set_hotkey(self, name, hotkey):
+        def rebind(conn):
+            previous = conn.execute(f"SELECT {COLUMNS} FROM patterns WHERE name = ?", (name,)).fetchone()
+            if previous is None:
+                return None, None
+            conn.execute("UPDATE patterns SET hotkey = ?, hotkey_key = ? WHERE name = ?",
+                         (hotkey, hotkey_key(hotkey), name))
+            previous = _entry(previous)
+            return {**previous, 'hotkey': hotkey}, previous
+
+        return self.db.write(rebind)
+
+    def delete(self, name):
+        def delete(conn):
+            previous = conn.execute(f"SELECT {COLUMNS} FROM patterns WHERE name = ?", (name,)).fetchone()
+            if previous is not None:
+                conn.execute("DELETE FROM patterns WHERE name = ?", (name,))
+            return _entry(previous) if previous else None
+
+        return self.db.write(delete)
+
+    def __len__(self):
+        return self.db.read("SELECT COUNT(*) FROM patterns")[0][0]
+
+    def __contains__(self, name):
+        return bool(self.db.read("SELECT 1 FROM patterns WHERE name = ?", (name,)))
+
+
+def migrate_json(db, data_file, patterns_file):
+    """Import data.json and patterns.json the first time the database is opened.
+
+    Runs once per database (recorded in meta); the JSON files are left in
+    place as a backup.
+    """
+    from store import load_json
+    from journal import JournaledDocument
+
+    def migrate(conn):
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_json'").fetchone():
+            return None
+        imported = {'data': False, 'patterns': 0}
+        if os.path.exists(data_file) or os.path.exists(data_file + '.journal'):
+            # Through the journal, so changes made since the last compaction come along
+            document = JournaledDocument(data_file, [])
+            try:
+                value = document.get()
+            finally:
+                document.close()
+            conn.execute("INSERT OR REPLACE INTO blobs (key, value) VALUES ('data', ?)",
+                         (json.dumps(value, separators=(',', ':')),))
+            imported['data'] = True
+        for entry in load_json(patterns_file, []):
+            if isinstance(entry, dict) and entry.get('name'):
+                hotkey = entry.get('hotkey') or ''
+                conn.execute(UPSERT, (entry['name'], json.dumps(entry.get('pattern') or []), hotkey,
+                                      hotkey_key(hotkey)))
+                imported['patterns'] += 1
+        conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_json', ?)", (json.dumps(imported),))
+        return imported
+
+    imported = db.write(migrate)
+    if imported:
+        print(f"[Storage] Migrated {data_file} ({'yes' if imported['data'] else 'missing'}) and "
+              f"{imported['patterns']} patterns from {patterns_file} into {db.path}")
+    return imported
@@ -0,0 +1,28 @@
+# watcher/storage.py
+import os
+
+from store import JsonStore
+from journal import JournaledDocument
+from registry import PatternRegistry
+
+DEFAULT_DB = "watcher.db"
+
+def open_storage(data_file, patterns_file, backend=None):
+    """Return (data store, pattern registry) for the configured backend.
+
+    WATCHER_STORAGE=json (default): the JSON files, held in memory. Data
+    changes are appended to data.json.journal and compacted into data.json
+    periodically; patterns are written back in the background.
+    WATCHER_STORAGE=sqlite: one SQLite database in WAL mode (WATCHER_DB,
+    default watcher.db) with a row per pattern and transactional writes;
+    the JSON files are imported the first time it is opened.
+    """
+    backend = (backend or os.getenv('WATCHER_STORAGE') or 'json').lower()
+    if backend == 'json':
+        return JournaledDocument(data_file, []), PatternRegistry(JsonStore(patterns_file, []))
+    if backend == 'sqlite':
+        from sqlite_store import SqliteDB, SqliteBlob, SqlitePatterns, migrate_json
+        db = SqliteDB(os.getenv('WATCHER_DB') or DEFAULT_DB)
+        migrate_json(db, data_file, patterns_file)
+        return SqliteBlob(db, 'data', []), SqlitePatterns(db)
+    raise ValueError(f"Unknown WATCHER_STORAGE backend: {backend} (use json or sqlite)")
@@ -0,0 +1,134 @@
+# watcher/store.py
+import os
+import json
+import time
+import atexit
+import threading
+
+def load_json(path, default):
+    try:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"[WARN] Failed to load {path}: {e}")
+    return default
+
+def save_json(path, data):
+    """Write JSON via a temp file + rename, so the file is never half-written"""
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+        return True
+    except Exception as e:
+        print(f"[WARN] Failed to save {path}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+
+
+class JsonStore:
+    """A JSON file loaded once and served from memory, written back in the background.
+
+    set() swaps the in-memory value and returns immediately; a flusher
+    thread writes the file once writes have been quiet for `delay` seconds
+    (but at most `max_delay` after the first unsaved write), so bursts of
+    writes coalesce into one save. Pending writes are also flushed at exit.
+
+    Values are shared with readers: treat what get() returns as read-only
+    and set() a new object instead of mutating it. set() also takes a
+    function that builds the value; it runs only when the value is next
+    needed (get(), body() or the background save), so a burst of writes
+    builds it once. It is called without the store's lock held.
+    """
+
+    def __init__(self, path, default, delay=0.25, max_delay=2.0):
+        self.path = path
+        self.delay = delay
+        self.max_delay = max_delay
+        self._value = load_json(path, default)
+        self._version = 0
+        self._body = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._first_unsaved = None
+        self._last_write = 0.0
+        self._wake = threading.Event()
+        threading.Thread(target=self._run, name=f"store:{os.path.basename(path)}", daemon=True).start()
+        _stores.append(self)
+
+    def get(self):
+        with self._lock:
+            value, version = self._value, self._version
+        if not callable(value):
+            return value
+        built = value()
+        with self._lock:
+            if self._version == version:
+                self._value = built
+        return built
+
+    def body(self):
+        """The value as compact JSON bytes, cached until the next write"""
+        body = self._body
+        if body is None:
+            value = self.get()
+            body = json.dumps(value, separators=(',', ':')).encode('utf-8')
+            with self._lock:
+                if self._value is value:
+                    self._body = body
+        return body
+
+    def set(self, value):
+        now = time.monotonic()
+        with self._lock:
+            self._value = value
+            self._version += 1
+            self._body = None
+            self._last_write = now
+            if self._first_unsaved is None:
+                self._first_unsaved = now
+        self._wake.set()
+
+    def flush(self):
+        """Write pending changes now; returns False if the save failed"""
+        with self._flush_lock:
+            with self._lock:
+                if self._first_unsaved is None:
+                    return True
+                first_unsaved = self._first_unsaved
+                self._first_unsaved = None
+            if save_json(self.path, self.get()):
+                return True
+            # Keep it dirty so the next round retries
+            with self._lock:
+                if self._first_unsaved is None:
+                    self._first_unsaved = first_unsaved
+            return False
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                if self._first_unsaved is None:
+                    self._wake.clear()
+                    continue
+                due = min(self._last_write + self.delay, self._first_unsaved + self.max_delay)
+            wait = due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+                continue
+            if not self.flush():
+                time.sleep(self.max_delay)
+
+
+_stores = []
+
+@atexit.register
+def flush_all():
+    for store in _stores:
+        store.flush()